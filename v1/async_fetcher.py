@@ -0,0 +1,272 @@
+# async_fetcher.py
+# Description: Concurrent fetch engine for the news scraping pipeline.
+# Fetches Yahoo Finance news pages for many tickers at once with bounded concurrency,
+# a per-host token bucket (instead of fixed sleeps) and backoff that adapts to 503 responses.
+
+import asyncio
+import functools
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from news_scraper import HEADERS, build_yahoo_news_url, parse_yahoo_news_html
+
+# Configuration
+# Maximum number of requests in flight at the same time (across all hosts).
+MAX_CONCURRENT_REQUESTS = 8
+# Sustained request rate allowed per host, and how many requests may be sent in a burst.
+REQUESTS_PER_SECOND_PER_HOST = 2.0
+BURST_PER_HOST = 4
+# After a throttling response the host's rate climbs back linearly, from its lowest value to the
+# configured rate in this many seconds.
+RATE_RECOVERY_SECONDS = 30.0
+# Retry policy for 503/429 responses, timeouts and connection errors.
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 60.0
+REQUEST_TIMEOUT = 20
+
+# Status codes that mean "slow down" rather than "this page is broken".
+THROTTLE_STATUS_CODES = (429, 503)
+
+FetchResult = namedtuple('FetchResult', ['ticker', 'url', 'status_code', 'news_items', 'error', 'attempts'])
+
+
+class TokenBucket:
+    """
+    Token bucket limiting the request rate to a single host.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; each request takes one.
+    A throttling response pauses the bucket and halves the rate, at most once per pause; once the
+    pause is over the rate climbs back linearly with time towards the configured rate, so the
+    crawl settles at whatever pace the server tolerates.
+    """
+
+    def __init__(self, rate, capacity, recovery_seconds=RATE_RECOVERY_SECONDS):
+        self.max_rate = rate
+        self.min_rate = rate / 16
+        self.rate = rate
+        self.recovery_per_second = rate / recovery_seconds
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.recovered_at = self.updated_at
+        self.paused_until = 0.0
+        self.decreased_at = float('-inf')
+        self._lock = asyncio.Lock()
+
+    def _recover(self, now):
+        start = max(self.recovered_at, self.paused_until)
+        if now > start:
+            self.rate = min(self.max_rate, self.rate + (now - start) * self.recovery_per_second)
+            self.recovered_at = now
+
+    def _refill(self, now):
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = max(self.updated_at, now)
+
+    async def acquire(self):
+        """Waits until a request to this host is allowed. Waiters are served in arrival order."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._recover(now)
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def penalize(self, delay, sent_at):
+        """
+        Called on a throttling response: pauses the host for `delay` seconds and halves the rate.
+
+        Args:
+            delay (float): Seconds to pause the host.
+            sent_at (float): time.monotonic() when the throttled request was sent.
+        """
+        now = time.monotonic()
+        # One decrease per backoff window: further 503s during the pause, and responses to
+        # requests sent before the last decrease, only extend the pause.
+        if now >= self.paused_until and sent_at >= self.decreased_at:
+            self._recover(now)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.decreased_at = now
+        self.paused_until = max(self.paused_until, now + delay)
+        self.tokens = 0
+        self.updated_at = self.paused_until
+
+
+class HostRateLimiter:
+    """Keeps one TokenBucket per host so that different hosts are throttled independently."""
+
+    def __init__(self, rate=REQUESTS_PER_SECOND_PER_HOST, burst=BURST_PER_HOST):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+
+    def bucket_for(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return self.buckets[host]
+
+
+def _backoff_delay(attempt):
+    """Exponential backoff with full jitter for the given (1-based) attempt number."""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** (attempt - 1))))
+
+
+def _retry_after_seconds(response):
+    """Returns the server's Retry-After hint in seconds, or None if absent/unparseable."""
+    value = response.headers.get('Retry-After')
+    try:
+        return min(BACKOFF_MAX_SECONDS, max(0.0, float(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+async def _fetch_page(ticker, url, session, executor, limiter, semaphore, max_retries, timeout):
+    """Fetches and parses one page, retrying throttling responses and network errors. Never raises."""
+    loop = asyncio.get_running_loop()
+    bucket = limiter.bucket_for(url)
+    get = functools.partial(session.get, url, headers=HEADERS, timeout=timeout)
+    attempt = 0
+
+    while True:
+        attempt += 1
+        await bucket.acquire()
+        sent_at = time.monotonic()
+        try:
+            async with semaphore:
+                response = await loop.run_in_executor(executor, get)
+        except requests.exceptions.RequestException as req_err:
+            if attempt > max_retries:
+                return FetchResult(ticker, url, None, None, f"{type(req_err).__name__}: {req_err}", attempt)
+            delay = _backoff_delay(attempt)
+            print(f"Request error for '{ticker}' ({type(req_err).__name__}). Retrying in {delay:.1f}s (attempt {attempt}/{max_retries}).")
+            await asyncio.sleep(delay)
+            continue
+
+        if response.status_code in THROTTLE_STATUS_CODES:
+            delay = _retry_after_seconds(response) or _backoff_delay(attempt)
+            bucket.penalize(delay, sent_at)
+            if attempt > max_retries:
+                return FetchResult(ticker, url, response.status_code, None, f"HTTP {response.status_code} after {attempt} attempts", attempt)
+            print(f"Yahoo Finance returned {response.status_code} for '{ticker}'. Backing off host for {delay:.1f}s (attempt {attempt}/{max_retries}).")
+            continue
+
+        if response.status_code >= 400:
+            return FetchResult(ticker, url, response.status_code, None, f"HTTP {response.status_code}", attempt)
+
+        # Parsed on the executor as well, so the event loop keeps scheduling other fetches meanwhile.
+        try:
+            news_items = await loop.run_in_executor(executor, parse_yahoo_news_html, response.text, ticker)
+        except Exception as parse_err:
+            return FetchResult(ticker, url, response.status_code, None, f"Parse error: {parse_err}", attempt)
+        return FetchResult(ticker, url, response.status_code, news_items, None, attempt)
+
+
+async def fetch_news_pages(tickers, on_result=None, url_template=None,
+                           max_concurrency=MAX_CONCURRENT_REQUESTS,
+                           rate_per_host=REQUESTS_PER_SECOND_PER_HOST,
+                           burst_per_host=BURST_PER_HOST,
+                           max_retries=MAX_RETRIES, timeout=REQUEST_TIMEOUT):
+    """
+    Fetches and parses the Yahoo Finance news pages of many tickers concurrently.
+
+    Args:
+        tickers (list): Ticker symbols to fetch.
+        on_result (callable, optional): Called with each FetchResult (holding the parsed news items)
+                                        as soon as it completes.
+        url_template (str, optional): Overrides the Yahoo URL template (e.g. a local stand-in server).
+        max_concurrency (int): Maximum number of requests in flight.
+        rate_per_host (float): Sustained requests per second allowed per host.
+        burst_per_host (int): Token bucket capacity per host.
+        max_retries (int): Retries for throttling responses and network errors.
+        timeout (float): Per-request timeout in seconds.
+
+    Returns:
+        list: FetchResult tuples in completion order.
+    """
+    limiter = HostRateLimiter(rate_per_host, burst_per_host)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results = []
+
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        tasks = [
+            asyncio.ensure_future(_fetch_page(ticker, build_yahoo_news_url(ticker, url_template), session,
+                                              executor, limiter, semaphore, max_retries, timeout))
+            for ticker in tickers
+        ]
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            results.append(result)
+            if on_result:
+                on_result(result)
+
+    return results
+
+
+def crawl_tickers(tickers, on_ticker_done=None, url_template=None, keep_results=True, **fetch_options):
+    """
+    Scrapes news for many tickers with the concurrent fetch engine.
+
+    Args:
+        tickers (list): Ticker symbols to scrape.
+        on_ticker_done (callable, optional): Called as on_ticker_done(ticker, news_items, error)
+                                             as soon as each ticker has been fetched and parsed.
+                                             `error` is None on success.
+        url_template (str, optional): Overrides the Yahoo URL template (e.g. a local stand-in server).
+        keep_results (bool): Collect the news items in the returned dict. Pass False when
+                             on_ticker_done already persists them, to keep memory bounded.
+        **fetch_options: Passed on to fetch_news_pages (max_concurrency, rate_per_host, ...).
+
+    Returns:
+        dict: Maps each ticker to its list of news items (empty if fetching failed, or
+              an empty dict if keep_results is False).
+    """
+    news_by_ticker = {}
+    completed = [0]
+
+    def handle_result(result):
+        completed[0] += 1
+        news_items = result.news_items or []
+        if result.error:
+            print(f"[{completed[0]}/{len(tickers)}] Failed to fetch news for '{result.ticker}': {result.error}")
+        else:
+            print(f"[{completed[0]}/{len(tickers)}] Extracted {len(news_items)} news items for '{result.ticker}'.")
+        if keep_results:
+            news_by_ticker[result.ticker] = news_items
+        if on_ticker_done:
+            on_ticker_done(result.ticker, news_items, result.error)
+
+    print(f"Fetching {len(tickers)} ticker page(s) concurrently...")
+    asyncio.run(fetch_news_pages(tickers, on_result=handle_result, url_template=url_template, **fetch_options))
+    return news_by_ticker
+
+
+if __name__ == '__main__':
+    # Example usage: crawl a few tickers, optionally against a local stand-in server, e.g.
+    #   python async_fetcher.py "http://127.0.0.1:8000/quote/{ticker}/news"
+    import sys
+
+    template = sys.argv[1] if len(sys.argv) > 1 else None
+    sample_tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA']
+    start = time.time()
+    collected = crawl_tickers(sample_tickers, url_template=template)
+    total = sum(len(items) for items in collected.values())
+    print(f"Collected {total} articles for {len(sample_tickers)} tickers in {time.time() - start:.2f} seconds.")
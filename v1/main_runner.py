@@ -4,22 +4,42 @@
 
 import time
 import os # Added os module to check current working directory
+import sys
 from datetime import datetime
 
+# sp500_utils.py is shared with the v2 app and lives in v2/model-in-action (appended, so that
+# v1's own modules are always found first)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "v2", "model-in-action"))
+
 # --- Attempt to import from other modules ---
 try:
     from sp500_utils import get_sp500_tickers
-    from news_scraper import scrape_yahoo_finance_for_ticker, save_news_to_csv
-    print("Successfully imported modules: sp500_utils, news_scraper")
+    from news_scraper import scrape_yahoo_finance_with_status
+    from async_fetcher import crawl_tickers
+    from news_sink import open_news_sink
+    from run_journal import DONE, FAILED, MAX_TICKER_ATTEMPTS, PENDING, RunJournal, retry_backoff_delay
+    print("Successfully imported modules: sp500_utils, news_scraper, async_fetcher, news_sink, run_journal")
 except ImportError as e:
     print(f"ImportError occurred: {e}")
     print(f"Current working directory: {os.getcwd()}")
-    print("Please ensure 'sp500_utils.py' and 'news_scraper.py' are in the same directory as 'main_runner.py'.")
+    print("Please ensure 'news_scraper.py', 'async_fetcher.py', 'news_sink.py' and 'run_journal.py' are in the same directory as 'main_runner.py', and 'sp500_utils.py' is in v2/model-in-action.")
     exit() # Exit if imports fail
 
 # Configuration
-# Time delay between scraping different tickers (in seconds) to be respectful to servers.
+# Concurrent fetch mode: many tickers are fetched at once and politeness is enforced by a
+# per-host token bucket with adaptive 503 backoff (see async_fetcher.py) instead of fixed sleeps.
+# Set to False to fall back to the sequential one-ticker-at-a-time loop.
+USE_CONCURRENT_FETCH = True
+# Time delay between scraping different tickers (in seconds) in sequential mode only.
 DELAY_BETWEEN_TICKERS = 5  # Increased delay
+# Output: each ticker's articles are flushed as soon as it is done (see news_sink.py).
+# 'parquet' writes a dataset partitioned by date and ticker (needs pyarrow, falls back to 'csv').
+OUTPUT_FORMAT = 'parquet'
+OUTPUT_DIR = 'financial_news'
+# Run journal: per-ticker state of every run, used to resume interrupted runs and to retry
+# failed tickers (up to MAX_TICKER_ATTEMPTS, see run_journal.py) at the end of each pass.
+# Permanent failures such as HTTP 404 are not retried.
+JOURNAL_PATH = os.path.join(OUTPUT_DIR, 'crawl_journal.db')
 
 def get_user_ticker_choices():
     """
@@ -96,49 +116,112 @@ def get_user_ticker_choices():
         else:
             print("Invalid choice. Please enter a number between 1 and 4, or Q to quit.")
 
-def run_news_pipeline():
-    """
-    Main function to run the news scraping pipeline.
+def choose_run_to_resume(journal):
     """
-    print("--- NLP-Driven News Sentiment Analysis: Data Collection ---")
-    print(f"Current working directory for main_runner.py: {os.getcwd()}") # Helps debug path issues
-    
-    target_tickers = get_user_ticker_choices()
+    Offers to resume the most recent interrupted run, if there is one.
 
-    if not target_tickers:
-        print("No tickers selected. Exiting program.")
+    Returns:
+        str: The run id to resume, or None to start a new run.
+    """
+    run_id = journal.latest_unfinished_run()
+    if run_id is None:
+        return None
+
+    counts = journal.summary(run_id)
+    remaining = len(journal.tickers(run_id, (PENDING, FAILED), max_attempts=MAX_TICKER_ATTEMPTS))
+    print(f"\nFound an interrupted run '{run_id}': {counts[DONE]} ticker(s) done, {remaining} remaining.")
+    answer = input("Resume it? (yes/no): ").strip().lower()
+    if answer == 'yes':
+        return run_id
+    journal.finish_run(run_id) # Abandoned runs are not offered again
+    return None
+
+def fetch_tickers(tickers, save_ticker_news):
+    """
+    Runs one pass over the given tickers, calling save_ticker_news(ticker, news_items, error) for each.
+    """
+    if USE_CONCURRENT_FETCH:
+        crawl_tickers(tickers, on_ticker_done=save_ticker_news, keep_results=False)
         return
 
-    all_news_collected = []
-    start_time_pipeline = time.time()
+    for i, ticker in enumerate(tickers):
+        print(f"\n--- Processing Ticker {i+1}/{len(tickers)}: {ticker} ---")
 
-    print(f"\nStarting news scraping for {len(target_tickers)} ticker(s): {', '.join(target_tickers)}")
+        yahoo_news, error = scrape_yahoo_finance_with_status(ticker) # This function is from news_scraper
+        save_ticker_news(ticker, yahoo_news, error)
 
-    for i, ticker in enumerate(target_tickers):
-        print(f"\n--- Processing Ticker {i+1}/{len(target_tickers)}: {ticker} ---")
-        
-        yahoo_news = scrape_yahoo_finance_for_ticker(ticker) # This function is from news_scraper
-        if yahoo_news:
-            all_news_collected.extend(yahoo_news)
-        
-        if i < len(target_tickers) - 1: 
+        if i < len(tickers) - 1:
             print(f"Waiting for {DELAY_BETWEEN_TICKERS} seconds before next ticker...")
             time.sleep(DELAY_BETWEEN_TICKERS)
 
+def run_news_pipeline():
+    """
+    Main function to run the news scraping pipeline.
+    """
+    print("--- NLP-Driven News Sentiment Analysis: Data Collection ---")
+    print(f"Current working directory for main_runner.py: {os.getcwd()}") # Helps debug path issues
+
+    with RunJournal(JOURNAL_PATH) as journal: # This class is from run_journal
+        run_id = choose_run_to_resume(journal)
+        if run_id is None:
+            target_tickers = get_user_ticker_choices()
+
+            if not target_tickers:
+                print("No tickers selected. Exiting program.")
+                return
+
+            run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+            journal.start_run(run_id, target_tickers)
+
+        # Tickers that already succeeded in an interrupted run are not fetched again.
+        tickers_to_fetch = journal.tickers(run_id, (PENDING, FAILED), max_attempts=MAX_TICKER_ATTEMPTS)
+        articles_collected = 0
+        start_time_pipeline = time.time()
+
+        print(f"\nStarting news scraping for {len(tickers_to_fetch)} ticker(s) of run '{run_id}': {', '.join(tickers_to_fetch)}")
+
+        with open_news_sink(OUTPUT_FORMAT, OUTPUT_DIR, run_id) as sink: # This function is from news_sink
+            def save_ticker_news(ticker, news_items, error=None):
+                nonlocal articles_collected
+                if error:
+                    journal.mark_failed(run_id, ticker, error)
+                    return
+                # Written before the ticker is marked done, so a crash in between refetches it
+                # instead of losing its articles.
+                if news_items:
+                    articles_collected += sink.write_batch(ticker, news_items)
+                journal.mark_done(run_id, ticker, len(news_items))
+
+            fetch_tickers(tickers_to_fetch, save_ticker_news)
+
+            # Re-queue failed tickers with a growing delay until they succeed, fail permanently or run out of attempts.
+            retry_pass = 0
+            while True:
+                failed_tickers = journal.tickers(run_id, (FAILED,), max_attempts=MAX_TICKER_ATTEMPTS)
+                if not failed_tickers:
+                    break
+                retry_pass += 1
+                delay = retry_backoff_delay(retry_pass)
+                print(f"\n{len(failed_tickers)} ticker(s) failed. Retrying them in {delay:.0f} seconds (retry pass {retry_pass}): {', '.join(failed_tickers)}")
+                time.sleep(delay)
+                fetch_tickers(failed_tickers, save_ticker_news)
+
+        journal.finish_run(run_id)
+        counts = journal.summary(run_id)
+        failures = journal.failures(run_id)
+
     end_time_pipeline = time.time()
     pipeline_duration = end_time_pipeline - start_time_pipeline
 
-    if all_news_collected:
-        timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = f"financial_news_{timestamp_str}.csv"
-        
-        save_news_to_csv(all_news_collected, filename=output_filename) # This function is from news_scraper
-    else:
+    if not counts['articles']:
         print("\nNo news was collected from any source for the selected tickers.")
 
     print(f"\n--- Pipeline Finished ---")
-    print(f"Total tickers processed: {len(target_tickers)}")
-    print(f"Total articles collected: {len(all_news_collected)}")
+    print(f"Total tickers processed: {counts[DONE]} done, {counts[FAILED]} failed")
+    for ticker, attempts, last_error, retryable in failures:
+        reason = last_error if retryable else f"{last_error}, not retried"
+        print(f"  {ticker}: failed after {attempts} attempt(s) ({reason})")
+    print(f"Total articles collected: {articles_collected} in this session, {counts['articles']} in run '{run_id}'")
     print(f"Total pipeline duration: {pipeline_duration:.2f} seconds.")
 
 if __name__ == '__main__':
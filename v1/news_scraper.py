@@ -2,37 +2,270 @@
 # Description: Functions for scraping financial news headlines, primarily from Yahoo Finance,
 # and saving the collected data.
 
+import os
+import sys
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
-import time
 from datetime import datetime
 
+# embedded_stories.py is shared with the v2 scrapers and lives in v2/model-in-action
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "v2", "model-in-action"))
+from embedded_stories import extract_embedded_stories
+
+# lxml is optional: it provides the fast parser backend, BeautifulSoup's 'html.parser' is the fallback.
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:
+    etree = None
+    lxml_html = None
+
 # Standard User-Agent to mimic a browser.
 # Using a common browser User-Agent might sometimes help avoid blocks.
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
 
-def scrape_yahoo_finance_for_ticker(ticker_symbol):
+# !! IMPORTANT !!
+# VERIFY THIS URL MANUALLY IN A BROWSER. YAHOO FINANCE CHANGES FREQUENTLY.
+# If a run returns 404, this URL might be incorrect or the page structure changed significantly.
+YAHOO_NEWS_URL_TEMPLATE = "https://finance.yahoo.com/quote/{ticker}/news"
+
+# HTML parser backend used to extract stories: 'lxml' (compiled XPath, fast) or 'bs4' (pure Python).
+PARSER_BACKEND = 'lxml'
+
+# Read the story stream from the JSON payload embedded in the page before walking the DOM.
+# The DOM selectors remain the fallback for pages without a usable payload.
+USE_EMBEDDED_JSON = True
+
+# Text Yahoo Finance shows when a ticker has no news.
+NO_NEWS_MESSAGE = "There are no news reports for this period"
+
+def build_yahoo_news_url(ticker_symbol, url_template=None):
+    """
+    Builds the Yahoo Finance news page URL for a ticker symbol.
+
+    Args:
+        ticker_symbol (str): The stock ticker symbol (e.g., 'AAPL').
+        url_template (str, optional): A URL template with a '{ticker}' placeholder.
+                                      Defaults to YAHOO_NEWS_URL_TEMPLATE. Point it at a
+                                      local stand-in server for offline testing.
+
+    Returns:
+        str: The news page URL.
+    """
+    return (url_template or YAHOO_NEWS_URL_TEMPLATE).format(ticker=ticker_symbol)
+
+
+def _find_stories_bs4(html):
+    """
+    Locates the news stories on a page with BeautifulSoup and the pure-Python 'html.parser'.
+
+    Returns:
+        tuple: (stories, selector, no_news) where stories is a list of (headline, link, meta_text)
+               tuples (meta_text is None if the story has no publishing info), selector names the
+               selector that matched, and no_news tells whether the page says there is no news.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # --- Updated Selectors Based on Provided HTML Snippet ---
+    # We are targeting the <li> elements that represent individual news stories.
+    # The class 'stream-item story-item' seems more stable than the 'yf-' appended part.
+    # Alternatively, could target <section data-testid="storyitem">
+    selector = 'li class'
+    articles = soup.find_all('li', class_=lambda x: x and 'stream-item story-item' in x)
+    if not articles:
+        # Fallback: Try finding by data-testid on the section element
+        selector = 'data-testid'
+        articles = soup.find_all('section', {'data-testid': 'storyitem'})
+    if not articles:
+        # Check for common "no news" messages or different page structures
+        no_news = soup.find(text=lambda t: t and NO_NEWS_MESSAGE in t) is not None
+        return [], None, no_news
+
+    stories = []
+    for article_container in articles:
+        # Inside the container (either li or section):
+        # Find the headline text within an <h3> tag that has class 'clamp'
+        # Find the link URL from an <a> tag that has class 'titles' and an href attribute
+        # Find the div containing source and timestamp, which has class 'publishing'
+        headline_tag = article_container.find('h3', class_=lambda x: x and 'clamp' in x)
+        link_tag = article_container.find('a', class_=lambda x: x and 'titles' in x, href=True) # Get the specific link for the headline
+        meta_info_div = article_container.find('div', class_=lambda x: x and 'publishing' in x)
+
+        if headline_tag and link_tag:
+            # The meta text is typically "Source • Time"
+            meta_text = meta_info_div.get_text(separator=' • ', strip=True) if meta_info_div else None # Use ' • ' as separator for clean split
+            stories.append((headline_tag.get_text(strip=True), link_tag['href'], meta_text))
+    return stories, selector, False
+
+
+if lxml_html is not None:
+    # Compiled once at import; mirror the class-substring matching of the BeautifulSoup lambdas above.
+    _XPATH_STORY_ITEMS = etree.XPath("//li[contains(@class, 'stream-item story-item')]")
+    _XPATH_STORY_SECTIONS = etree.XPath("//section[@data-testid='storyitem']")
+    _XPATH_HEADLINE = etree.XPath(".//h3[contains(@class, 'clamp')]")
+    _XPATH_LINK = etree.XPath(".//a[contains(@class, 'titles')][@href]")
+    _XPATH_PUBLISHING = etree.XPath(".//div[contains(@class, 'publishing')]")
+    _XPATH_TEXT = etree.XPath(".//text()")
+    _XPATH_NO_NEWS = etree.XPath("//text()[contains(., $message)]")
+
+
+def _find_stories_lxml(html):
+    """
+    Locates the news stories on a page with lxml and precompiled XPath selectors.
+    Returns the same (stories, selector, no_news) tuple as _find_stories_bs4.
+    """
+    if not html.strip():
+        return [], None, False
+    tree = lxml_html.fromstring(html)
+
+    selector = 'li class'
+    articles = _XPATH_STORY_ITEMS(tree)
+    if not articles:
+        selector = 'data-testid'
+        articles = _XPATH_STORY_SECTIONS(tree)
+    if not articles:
+        return [], None, bool(_XPATH_NO_NEWS(tree, message=NO_NEWS_MESSAGE))
+
+    stories = []
+    for article_container in articles:
+        headline_tags = _XPATH_HEADLINE(article_container)
+        link_tags = _XPATH_LINK(article_container)
+        if headline_tags and link_tags:
+            headline = ''.join(t.strip() for t in _XPATH_TEXT(headline_tags[0]))
+            meta_divs = _XPATH_PUBLISHING(article_container)
+            meta_text = None
+            if meta_divs:
+                meta_text = ' • '.join(t.strip() for t in _XPATH_TEXT(meta_divs[0]) if t.strip())
+            stories.append((headline, link_tags[0].get('href'), meta_text))
+    return stories, selector, False
+
+
+# Available HTML parser backends for parse_yahoo_news_html.
+PARSER_BACKENDS = {
+    'bs4': _find_stories_bs4,
+    'lxml': _find_stories_lxml,
+}
+
+
+def _build_news_item(ticker_symbol, title, link, meta_text):
+    """Turns the raw fields of one story into a news item dictionary."""
+    # Ensure the link is absolute if it's relative
+    if link and not link.startswith('http'):
+        link = f"https://finance.yahoo.com{link}"
+
+    source_text = "N/A"
+    article_timestamp_str = "N/A"
+
+    # Extract source and timestamp from the meta info text
+    if meta_text is not None:
+        parts = [p.strip() for p in meta_text.split('•')]
+        if parts:
+            # Assume the part before the first '•' is the source
+            potential_source = parts[0]
+             # Basic check to avoid picking up non-source text if structure is weird
+            if len(potential_source) > 1 and len(potential_source) < 50 and not potential_source.lower().startswith("ad"):
+                source_text = potential_source
+
+            # Assume the part after the first '•' (if exists) is the time
+            if len(parts) > 1:
+                article_timestamp_str = parts[1]
+            # If only one part, maybe it's just the time (like "2 hours ago") or just the source
+            elif "ago" in meta_text or ":" in meta_text or "/" in meta_text or len(meta_text.split()) > 1:
+                 # Heuristic: if it looks like a timestamp, keep it
+                 article_timestamp_str = meta_text
+
+    return {
+        'ticker': ticker_symbol,
+        'headline': title,
+        'url': link,
+        'source': source_text,
+        'scraped_timestamp': datetime.now().isoformat(),
+        'article_timestamp_raw': article_timestamp_str
+    }
+
+
+def parse_yahoo_news_html(html, ticker_symbol, backend=None, use_embedded_json=None):
+    """
+    Extracts news items from the HTML of a Yahoo Finance news page.
+    Parsing makes no network calls, so it can be shared by the sequential and the concurrent fetchers.
+
+    Args:
+        html (str): The page HTML.
+        ticker_symbol (str): The stock ticker symbol the page belongs to.
+        backend (str, optional): One of PARSER_BACKENDS. Defaults to PARSER_BACKEND
+                                 ('bs4' is used if lxml is not installed).
+        use_embedded_json (bool, optional): Try extract_embedded_stories before the DOM backend.
+                                            Defaults to USE_EMBEDDED_JSON.
+
+    Returns:
+        list: A list of news item dictionaries (see scrape_yahoo_finance_for_ticker).
+              Returns an empty list if no articles could be located.
+    """
+    if use_embedded_json is None:
+        use_embedded_json = USE_EMBEDDED_JSON
+    if use_embedded_json:
+        embedded = extract_embedded_stories(html)
+        if embedded:
+            print(f"Found {len(embedded)} article items in the embedded JSON payload.")
+            scraped_timestamp = datetime.now().isoformat()
+            return [{
+                'ticker': ticker_symbol,
+                'headline': story['headline'],
+                'url': story['url'],
+                'source': story['source'],
+                'scraped_timestamp': scraped_timestamp,
+                'article_timestamp_raw': story['published']
+            } for story in embedded]
+
+    backend = backend or PARSER_BACKEND
+    if backend == 'lxml' and lxml_html is None:
+        backend = 'bs4'
+
+    stories, selector, no_news = PARSER_BACKENDS[backend](html)
+
+    if selector is None:
+        if no_news:
+            print(f"Yahoo Finance indicates no news available for '{ticker_symbol}'.")
+        else:
+            # This message will print if we got a 200 OK but couldn't find articles
+            print(f"Could not find news articles container for '{ticker_symbol}' using known selectors. Page structure might have changed.")
+        return []
+    print(f"Found {len(stories)} article items using {selector} selector.")
+
+    return [_build_news_item(ticker_symbol, title, link, meta_text) for title, link, meta_text in stories]
+
+
+def scrape_yahoo_finance_for_ticker(ticker_symbol, url_template=None):
     """
     Scrapes news headlines for a given ticker symbol from Yahoo Finance.
 
     Args:
         ticker_symbol (str): The stock ticker symbol (e.g., 'AAPL').
+        url_template (str, optional): Overrides YAHOO_NEWS_URL_TEMPLATE (see build_yahoo_news_url).
 
     Returns:
         list: A list of dictionaries, where each dictionary contains details of a news item
               (ticker, headline, url, source, scraped_timestamp, article_timestamp_raw).
               Returns an empty list if no news is found or an error occurs.
     """
-    # !! IMPORTANT !!
-    # VERIFY THIS URL MANUALLY IN A BROWSER. YAHOO FINANCE CHANGES FREQUENTLY.
-    # If the previous run returned 404, this URL might be incorrect or the page structure changed significantly.
-    # Based on your output, this URL is still returning 404. Find the correct one first!
-    url = f"https://finance.yahoo.com/quote/{ticker_symbol}/news"
+    news_items, _ = scrape_yahoo_finance_with_status(ticker_symbol, url_template)
+    return news_items
+
+
+def scrape_yahoo_finance_with_status(ticker_symbol, url_template=None):
+    """
+    Same as scrape_yahoo_finance_for_ticker, but also reports whether fetching the page failed.
+
+    Returns:
+        tuple: (news_items, error). `error` is None if the page was fetched (even if it had no
+               news), otherwise a short description of the failure (503, timeout, HTTP error, ...).
+    """
+    url = build_yahoo_news_url(ticker_symbol, url_template)
     news_items = []
-    articles = [] # Initialize articles here to prevent UnboundLocalError
+    error = None
 
     print(f"\nScraping news for '{ticker_symbol}' from Yahoo Finance ({url})...")
     try:
@@ -40,105 +273,31 @@ def scrape_yahoo_finance_for_ticker(ticker_symbol):
 
         if response.status_code == 503:
             print(f"Yahoo Finance returned a 503 Service Unavailable for '{ticker_symbol}'. The server might be temporarily down or rate-limiting. Try again later.")
-            return [] # Stop processing this ticker if 503 occurs
+            return [], "HTTP 503" # Stop processing this ticker if 503 occurs
 
         response.raise_for_status()  # Raise an HTTPError for other bad responses (4XX or 5XX)
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # --- Updated Selectors Based on Provided HTML Snippet ---
-        # We are targeting the <li> elements that represent individual news stories.
-        # The class 'stream-item story-item' seems more stable than the 'yf-' appended part.
-        # Alternatively, could target <section data-testid="storyitem">
-        articles = soup.find_all('li', class_=lambda x: x and 'stream-item story-item' in x)
-
-        if not articles:
-             # Fallback: Try finding by data-testid on the section element
-            articles = soup.find_all('section', {'data-testid': 'storyitem'})
-            if articles:
-                 print(f"Found {len(articles)} potential article items using data-testid selector.")
-            else:
-                # Check for common "no news" messages or different page structures
-                no_news_indicator = soup.find(text=lambda t: t and "There are no news reports for this period" in t)
-                if no_news_indicator:
-                    print(f"Yahoo Finance indicates no news available for '{ticker_symbol}'.")
-                else:
-                    # This message will print if we got a 200 OK but couldn't find articles
-                    print(f"Could not find news articles container for '{ticker_symbol}' using known selectors. Page structure might have changed.")
-                return []
-        else:
-             print(f"Found {len(articles)} potential article items using li class selector.")
-
-
-        for article_container in articles:
-            # Inside the container (either li or section):
-            # Find the headline text within an <h3> tag that has class 'clamp'
-            # Find the link URL from an <a> tag that has class 'titles' and an href attribute
-            # Find the div containing source and timestamp, which has class 'publishing'
-
-            headline_tag = article_container.find('h3', class_=lambda x: x and 'clamp' in x)
-            link_tag = article_container.find('a', class_=lambda x: x and 'titles' in x, href=True) # Get the specific link for the headline
-            meta_info_div = article_container.find('div', class_=lambda x: x and 'publishing' in x)
-
-
-            if headline_tag and link_tag:
-                title = headline_tag.get_text(strip=True)
-                link = link_tag['href']
-
-                # Ensure the link is absolute if it's relative
-                if link and not link.startswith('http'):
-                    link = f"https://finance.yahoo.com{link}"
-
-                source_text = "N/A"
-                article_timestamp_str = "N/A"
-
-                # Extract source and timestamp from the meta info div
-                if meta_info_div:
-                    # The text is typically "Source • Time"
-                    meta_text = meta_info_div.get_text(separator=' • ', strip=True) # Use ' • ' as separator for clean split
-                    parts = [p.strip() for p in meta_text.split('•')]
-                    if parts:
-                        # Assume the part before the first '•' is the source
-                        potential_source = parts[0]
-                         # Basic check to avoid picking up non-source text if structure is weird
-                        if len(potential_source) > 1 and len(potential_source) < 50 and not potential_source.lower().startswith("ad"):
-                            source_text = potential_source
-
-                        # Assume the part after the first '•' (if exists) is the time
-                        if len(parts) > 1:
-                            article_timestamp_str = parts[1]
-                        # If only one part, maybe it's just the time (like "2 hours ago") or just the source
-                        elif "ago" in meta_text or ":" in meta_text or "/" in meta_text or len(meta_text.split()) > 1:
-                             # Heuristic: if it looks like a timestamp, keep it
-                             article_timestamp_str = meta_text
-
-                news_items.append({
-                    'ticker': ticker_symbol,
-                    'headline': title,
-                    'url': link,
-                    'source': source_text,
-                    'scraped_timestamp': datetime.now().isoformat(),
-                    'article_timestamp_raw': article_timestamp_str
-                })
-
-            time.sleep(0.05) # Add a small delay between processing articles
+        news_items = parse_yahoo_news_html(response.text, ticker_symbol)
 
     except requests.exceptions.Timeout:
         print(f"Timeout occurred while trying to reach Yahoo Finance for '{ticker_symbol}'.")
+        error = "Timeout"
     except requests.exceptions.HTTPError as http_err:
         print(f"HTTP error occurred for '{ticker_symbol}': {http_err} (Status code: {response.status_code if 'response' in locals() else 'N/A'})")
+        error = f"HTTP error: {http_err}"
         if 'response' in locals() and response.status_code == 404:
             print(f"'{ticker_symbol}' news page not found at the expected URL.")
         # Note: Script execution continues after printing the error message
     except requests.exceptions.RequestException as req_err:
         print(f"A request error occurred while scraping '{ticker_symbol}' from Yahoo Finance: {req_err}")
+        error = f"{type(req_err).__name__}: {req_err}"
         # Note: Script execution continues after printing the error message
     except Exception as e:
         print(f"An unexpected error occurred while scraping '{ticker_symbol}' from Yahoo Finance: {e}")
+        error = f"{type(e).__name__}: {e}"
         # Note: Script execution continues after printing the error message
 
     # This final print block is outside the try...except and will always run.
-    # articles is now always defined due to initialization.
     if news_items:
         print(f"Successfully extracted {len(news_items)} news items for '{ticker_symbol}'.")
     elif 'response' in locals() and response.status_code == 503:
@@ -149,7 +308,7 @@ def scrape_yahoo_finance_for_ticker(ticker_symbol):
          # other request errors, or selectors not finding any articles after a 200 OK.
          print(f"No news items successfully extracted for '{ticker_symbol}'. Check the URL and selectors if needed.")
 
-    return news_items
+    return news_items, error
 
 
 def save_news_to_csv(all_news_data, filename="financial_news_headlines.csv"):
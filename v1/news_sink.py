@@ -0,0 +1,151 @@
+# news_sink.py
+# Description: Streaming output sinks for the news scraping pipeline.
+# Each ticker's articles are written as soon as that ticker is done, so memory stays bounded
+# during a crawl and an interrupted run keeps everything written so far.
+
+import csv
+import os
+from datetime import datetime, timezone
+
+# pyarrow is optional: it provides the Parquet sink, CsvNewsSink is the fallback.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Column order shared by every sink (same as save_news_to_csv).
+NEWS_COLUMNS = ['ticker', 'headline', 'url', 'source', 'article_timestamp_raw', 'scraped_timestamp']
+
+
+def _parse_iso_timestamp(value):
+    """Parses an ISO 8601 timestamp (e.g. '2025-05-14T23:00:00Z') into a UTC datetime, or None."""
+    if not value or value == "N/A":
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (ValueError, AttributeError):
+        return None # Relative times like "2 hours ago" stay in article_timestamp_raw only
+    if parsed.tzinfo is None:
+        parsed = parsed.astimezone() # Naive timestamps were recorded in local time
+    return parsed.astimezone(timezone.utc)
+
+
+class ParquetNewsSink:
+    """
+    Writes news batches as Parquet files partitioned by scrape date and ticker:
+
+        <root_dir>/date=YYYY-MM-DD/ticker=<TICKER>/part-<run_id>.parquet
+
+    The partition values are encoded in the directory names (Hive style) and read back with
+    e.g. pyarrow.dataset.dataset(root_dir, partitioning='hive'), so readers can prune by date
+    and ticker without opening files. Timestamps are stored as typed UTC timestamp columns.
+    """
+
+    SCHEMA = pa.schema([
+        ('headline', pa.string()),
+        ('url', pa.string()),
+        ('source', pa.string()),
+        ('article_timestamp_raw', pa.string()),
+        ('article_published', pa.timestamp('us', tz='UTC')),
+        ('scraped_timestamp', pa.timestamp('us', tz='UTC')),
+    ]) if pa is not None else None
+
+    def __init__(self, root_dir, run_id=None):
+        if pa is None:
+            raise ImportError("pyarrow is required for Parquet output ('pip install pyarrow').")
+        self.root_dir = root_dir
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.articles_written = 0
+        self.files_written = 0
+
+    def write_batch(self, ticker, news_items):
+        """
+        Writes one ticker's news items. Items are grouped by the date they were scraped on.
+
+        Returns:
+            int: The number of items written.
+        """
+        batches_by_date = {}
+        for item in news_items:
+            scraped = _parse_iso_timestamp(item.get('scraped_timestamp')) or datetime.now(timezone.utc)
+            batch = batches_by_date.setdefault(scraped.date().isoformat(), {name: [] for name in self.SCHEMA.names})
+            batch['headline'].append(item.get('headline', "N/A"))
+            batch['url'].append(item.get('url', "N/A"))
+            batch['source'].append(item.get('source', "N/A"))
+            batch['article_timestamp_raw'].append(item.get('article_timestamp_raw', "N/A"))
+            batch['article_published'].append(_parse_iso_timestamp(item.get('article_timestamp_raw')))
+            batch['scraped_timestamp'].append(scraped)
+
+        for date, columns in batches_by_date.items():
+            partition_dir = os.path.join(self.root_dir, f"date={date}", f"ticker={ticker}")
+            os.makedirs(partition_dir, exist_ok=True)
+            table = pa.Table.from_pydict(columns, schema=self.SCHEMA)
+            pq.write_table(table, os.path.join(partition_dir, f"part-{self.run_id}.parquet"))
+            self.files_written += 1
+
+        self.articles_written += len(news_items)
+        return len(news_items)
+
+    def close(self):
+        print(f"Data successfully saved to '{self.root_dir}' ({self.files_written} Parquet file(s)). Total articles: {self.articles_written}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CsvNewsSink:
+    """
+    Appends news batches to a single CSV file (UTF-8 with BOM, columns as in save_news_to_csv).
+    Used when pyarrow is not installed. An existing file (e.g. of a resumed run) is appended to.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.articles_written = 0
+        # 'utf-8-sig' writes the BOM once at the start of the file, not when appending.
+        self._file = open(filename, 'a', newline='', encoding='utf-8-sig')
+        self._writer = csv.DictWriter(self._file, fieldnames=NEWS_COLUMNS, restval="N/A", extrasaction='ignore')
+        if self._file.tell() == 0:
+            self._writer.writeheader()
+
+    def write_batch(self, ticker, news_items):
+        self._writer.writerows(news_items)
+        self._file.flush() # Keep what has been collected so far if the run is interrupted
+        self.articles_written += len(news_items)
+        return len(news_items)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            print(f"Data successfully saved to '{self.filename}'. Total articles: {self.articles_written}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_news_sink(output_format, output_dir, run_id):
+    """
+    Opens the sink for a crawl run.
+
+    Args:
+        output_format (str): 'parquet' or 'csv'. Falls back to 'csv' if pyarrow is not installed.
+        output_dir (str): Root directory of the Parquet dataset, or the directory of the CSV file.
+        run_id (str): Identifies the run in file names (e.g. a timestamp).
+
+    Returns:
+        ParquetNewsSink or CsvNewsSink
+    """
+    if output_format == 'parquet':
+        if pa is not None:
+            return ParquetNewsSink(output_dir, run_id=run_id)
+        print("pyarrow is not installed; writing CSV instead of Parquet ('pip install pyarrow' to enable Parquet).")
+    os.makedirs(output_dir, exist_ok=True)
+    return CsvNewsSink(os.path.join(output_dir, f"financial_news_{run_id}.csv"))
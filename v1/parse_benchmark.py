@@ -0,0 +1,173 @@
+# parse_benchmark.py
+# Description: Benchmarks the HTML parser backends of news_scraper.py over saved Yahoo Finance
+# news pages (fixtures/*.html), plus the embedded-JSON extraction mode. Checks that every
+# backend extracts the same records as the reference 'bs4' backend and reports parse throughput
+# per page, so regressions are visible.
+#
+# The committed *_sample.html fixtures are synthetic: they were written by hand after the markup
+# the selectors target, because no live page could be captured at the time. Agreement on them only
+# shows that the backends agree with each other; capture real pages with --save to check the
+# selectors and the embedded-JSON key paths against what Yahoo actually serves.
+#
+# Usage:
+#   python parse_benchmark.py                     # benchmark all fixtures
+#   python parse_benchmark.py --require-capture   # fail unless at least one fixture is a real capture
+#   python parse_benchmark.py --save AAPL         # capture the live news page of a ticker as a fixture
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+
+import requests
+
+from news_scraper import HEADERS, PARSER_BACKENDS, build_yahoo_news_url, lxml_html, parse_yahoo_news_html
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+REFERENCE_BACKEND = 'bs4'
+# Name under which the embedded-JSON extraction mode is reported.
+EMBEDDED_JSON_MODE = 'json'
+# Fields compared between backends ('scraped_timestamp' differs by construction).
+COMPARED_FIELDS = ('ticker', 'headline', 'url', 'source', 'article_timestamp_raw')
+# The embedded payload carries ISO publication dates instead of the relative times shown on the page.
+EMBEDDED_JSON_COMPARED_FIELDS = ('ticker', 'headline', 'url', 'source')
+# Hand-written fixtures say so in their leading comment.
+SYNTHETIC_MARKER = 'Synthetic Yahoo Finance news page'
+
+
+def save_fixture(ticker_symbol, fixtures_dir=FIXTURES_DIR):
+    """
+    Downloads the Yahoo Finance news page of a ticker and stores it as a benchmark fixture.
+    The captured page is checked right away: the stories read from its embedded JSON payload
+    must be the ones the DOM backend finds, otherwise the payload's key paths have drifted.
+
+    Returns:
+        str: The path of the saved fixture.
+    """
+    response = requests.get(build_yahoo_news_url(ticker_symbol), headers=HEADERS, timeout=20)
+    response.raise_for_status()
+    os.makedirs(fixtures_dir, exist_ok=True)
+    path = os.path.join(fixtures_dir, f"yahoo_news_{ticker_symbol.lower()}_{time.strftime('%Y%m%d')}.html")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(response.text)
+    print(f"Saved fixture for '{ticker_symbol}' to '{path}'.")
+
+    dom = _comparable(_parse_quietly(response.text, REFERENCE_BACKEND), EMBEDDED_JSON_COMPARED_FIELDS)
+    embedded = _comparable(_parse_quietly(response.text, EMBEDDED_JSON_MODE), EMBEDDED_JSON_COMPARED_FIELDS)
+    if not embedded:
+        print(f"WARNING: no stories found in the embedded JSON of the captured page ({len(dom)} in the DOM).")
+    elif embedded != dom:
+        print(f"WARNING: the embedded JSON gives {len(embedded)} stories, the DOM {len(dom)}, and they differ.")
+    else:
+        print(f"The embedded JSON and the DOM agree on {len(dom)} stories.")
+    return path
+
+
+def is_synthetic(html):
+    """True for a hand-written fixture, False for a page captured with --save."""
+    return SYNTHETIC_MARKER in html[:1000]
+
+
+def _parse_quietly(html, backend):
+    # parse_yahoo_news_html reports what it finds; keep that out of the timings and the output.
+    with contextlib.redirect_stdout(io.StringIO()):
+        if backend == EMBEDDED_JSON_MODE:
+            return parse_yahoo_news_html(html, 'FIXTURE', use_embedded_json=True)
+        return parse_yahoo_news_html(html, 'FIXTURE', backend=backend, use_embedded_json=False)
+
+
+def _comparable(records, fields=COMPARED_FIELDS):
+    return [tuple(record[field] for field in fields) for record in records]
+
+
+def benchmark_backend(pages, backend, repeat=20):
+    """
+    Parses every page `repeat` times with one backend.
+
+    Returns:
+        float: Pages parsed per second.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            _parse_quietly(html, backend)
+    return (repeat * len(pages)) / (time.perf_counter() - start)
+
+
+def run_benchmark(fixtures_dir=FIXTURES_DIR, repeat=20, min_speedup=1.0, require_capture=False):
+    """
+    Runs the benchmark over all fixtures.
+
+    Args:
+        fixtures_dir (str): Directory holding the *.html fixtures.
+        repeat (int): Number of passes over the fixtures per backend.
+        min_speedup (float): Minimum throughput of each non-reference backend relative to the
+                             reference backend; anything lower is reported as a regression.
+        require_capture (bool): Fail if every fixture is synthetic.
+
+    Returns:
+        bool: True if all backends agree with the reference and none regressed (and, with
+              require_capture, at least one fixture is a captured page).
+    """
+    paths = sorted(glob.glob(os.path.join(fixtures_dir, '*.html')))
+    if not paths:
+        print(f"No fixtures found in '{fixtures_dir}'.")
+        return False
+
+    pages = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            pages.append(f.read())
+
+    backends = [name for name in PARSER_BACKENDS if name != 'lxml' or lxml_html is not None]
+    backends.append(EMBEDDED_JSON_MODE)
+    ok = True
+
+    captured = sum(1 for html in pages if not is_synthetic(html))
+    print(f"Checking {len(backends)} backend(s) against '{REFERENCE_BACKEND}' on {len(pages)} fixture(s) "
+          f"({captured} captured, {len(pages) - captured} synthetic)...")
+    if not captured:
+        print("NOTE: all fixtures are synthetic, so agreement only shows the backends agree with each other. "
+              "Capture a real page with --save TICKER to check them against Yahoo's markup.")
+        if require_capture:
+            ok = False
+    for path, html in zip(paths, pages):
+        reference = _parse_quietly(html, REFERENCE_BACKEND)
+        for backend in backends:
+            fields = EMBEDDED_JSON_COMPARED_FIELDS if backend == EMBEDDED_JSON_MODE else COMPARED_FIELDS
+            expected = _comparable(reference, fields)
+            actual = _comparable(_parse_quietly(html, backend), fields)
+            if actual != expected:
+                ok = False
+                print(f"MISMATCH: '{backend}' extracted {len(actual)} records from {os.path.basename(path)}, "
+                      f"'{REFERENCE_BACKEND}' extracted {len(expected)}.")
+
+    throughput = {backend: benchmark_backend(pages, backend, repeat) for backend in backends}
+    reference = throughput[REFERENCE_BACKEND]
+    for backend, pages_per_second in throughput.items():
+        speedup = pages_per_second / reference
+        print(f"{backend:>6}: {pages_per_second:8.1f} pages/s ({1000 / pages_per_second:6.2f} ms/page, {speedup:.1f}x)")
+        if backend != REFERENCE_BACKEND and speedup < min_speedup:
+            ok = False
+            print(f"REGRESSION: '{backend}' is below the required {min_speedup:.1f}x of '{REFERENCE_BACKEND}'.")
+    return ok
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the news page parser backends.")
+    parser.add_argument('--save', metavar='TICKER', help="Save the live news page of TICKER as a fixture and exit.")
+    parser.add_argument('--repeat', type=int, default=20, help="Passes over the fixtures per backend.")
+    parser.add_argument('--min-speedup', type=float, default=1.0,
+                        help="Minimum throughput of the other backends relative to 'bs4'.")
+    parser.add_argument('--require-capture', action='store_true',
+                        help="Fail unless at least one fixture is a page captured with --save.")
+    args = parser.parse_args()
+
+    if args.save:
+        save_fixture(args.save.upper())
+    else:
+        sys.exit(0 if run_benchmark(repeat=args.repeat, min_speedup=args.min_speedup,
+                                   require_capture=args.require_capture) else 1)
@@ -0,0 +1,178 @@
+# run_journal.py
+# Description: Run journal for the news scraping pipeline.
+# Records the state of every ticker of a crawl run (pending, done or failed, with its attempt
+# count) in a local SQLite file, so an interrupted run can be resumed without refetching the
+# tickers that already succeeded, and failed tickers can be retried at the end of a pass.
+# Failures that another attempt cannot fix (HTTP 4xx other than 429) are not retried.
+
+import os
+import random
+import re
+import sqlite3
+from datetime import datetime
+
+# Ticker states
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+# Total attempts per ticker (first pass included) before it is left as failed.
+MAX_TICKER_ATTEMPTS = 3
+# Wait before each retry pass: base * 2^(pass - 1), with jitter, capped.
+RETRY_BACKOFF_BASE_SECONDS = 30.0
+RETRY_BACKOFF_MAX_SECONDS = 300.0
+
+# Status code in the error descriptions of async_fetcher ("HTTP 404") and news_scraper
+# ("HTTP error: 404 Client Error: ...").
+HTTP_STATUS_PATTERN = re.compile(r'HTTP (?:error: )?(\d{3})\b')
+
+
+def retry_backoff_delay(retry_pass):
+    """Delay (in seconds) before the given (1-based) retry pass over the failed tickers."""
+    delay = min(RETRY_BACKOFF_MAX_SECONDS, RETRY_BACKOFF_BASE_SECONDS * (2 ** (retry_pass - 1)))
+    return delay * random.uniform(0.75, 1.25)
+
+
+def is_retryable_error(error):
+    """
+    Tells whether a failed ticker is worth another attempt.
+
+    Client errors (HTTP 4xx, e.g. 404 for an unknown ticker) are permanent, except 429 Too Many
+    Requests. Server errors, timeouts, connection and parse errors are retried.
+    """
+    match = HTTP_STATUS_PATTERN.search(str(error))
+    if not match:
+        return True
+    status_code = int(match.group(1))
+    return not (400 <= status_code < 500) or status_code == 429
+
+
+class RunJournal:
+    """
+    SQLite journal of crawl runs and their per-ticker state.
+
+    Every state change is committed immediately, so the journal reflects all finished tickers
+    even if the process is killed. Tickers that were in flight at that point are still pending.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    started_at TEXT NOT NULL,
+                    finished_at TEXT
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS run_tickers (
+                    run_id TEXT NOT NULL,
+                    ticker TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    articles INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    retryable INTEGER NOT NULL DEFAULT 1,
+                    updated_at TEXT,
+                    PRIMARY KEY (run_id, ticker)
+                )
+            """)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(run_tickers)")}
+            if 'retryable' not in columns:
+                # Journals created before permanent failures were told apart: all failures stay retryable
+                self._conn.execute("ALTER TABLE run_tickers ADD COLUMN retryable INTEGER NOT NULL DEFAULT 1")
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start_run(self, run_id, tickers):
+        """Registers a new run with all of its tickers pending."""
+        now = datetime.now().isoformat()
+        with self._conn:
+            self._conn.execute("INSERT INTO runs (run_id, started_at) VALUES (?, ?)", (run_id, now))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO run_tickers (run_id, ticker, position, status, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, ticker, position, PENDING, now) for position, ticker in enumerate(tickers)],
+            )
+
+    def finish_run(self, run_id):
+        with self._conn:
+            self._conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (datetime.now().isoformat(), run_id))
+
+    def latest_unfinished_run(self):
+        """
+        Returns the id of the most recent run that was interrupted before it finished, or None.
+        """
+        row = self._conn.execute(
+            "SELECT run_id FROM runs WHERE finished_at IS NULL ORDER BY started_at DESC LIMIT 1"
+        ).fetchone()
+        return row[0] if row else None
+
+    def tickers(self, run_id, statuses=(PENDING, FAILED), max_attempts=None):
+        """
+        Returns the tickers of a run in one of the given states, in their original order.
+
+        Args:
+            run_id (str): The run to look at.
+            statuses (tuple): States to include.
+            max_attempts (int, optional): Only include tickers that can still be attempted: fewer
+                                          attempts than this and no permanent failure.
+        """
+        query = (f"SELECT ticker FROM run_tickers WHERE run_id = ? "
+                 f"AND status IN ({','.join('?' * len(statuses))})")
+        params = [run_id, *statuses]
+        if max_attempts is not None:
+            query += " AND retryable AND attempts < ?"
+            params.append(max_attempts)
+        return [row[0] for row in self._conn.execute(query + " ORDER BY position", params)]
+
+    def mark_done(self, run_id, ticker, articles):
+        self._update(run_id, ticker, DONE, articles=articles, error=None, retryable=True)
+
+    def mark_failed(self, run_id, ticker, error):
+        """Records a failed attempt; permanent failures (see is_retryable_error) are not retried."""
+        self._update(run_id, ticker, FAILED, articles=0, error=str(error), retryable=is_retryable_error(error))
+
+    def _update(self, run_id, ticker, status, articles, error, retryable):
+        with self._conn:
+            self._conn.execute(
+                "UPDATE run_tickers SET status = ?, attempts = attempts + 1, articles = ?, last_error = ?, "
+                "retryable = ?, updated_at = ? WHERE run_id = ? AND ticker = ?",
+                (status, articles, error, int(retryable), datetime.now().isoformat(), run_id, ticker),
+            )
+
+    def summary(self, run_id):
+        """
+        Returns:
+            dict: Maps each state to the number of tickers in it, plus 'articles' (total collected).
+        """
+        counts = {PENDING: 0, DONE: 0, FAILED: 0, 'articles': 0}
+        rows = self._conn.execute(
+            "SELECT status, COUNT(*), SUM(articles) FROM run_tickers WHERE run_id = ? GROUP BY status", (run_id,)
+        )
+        for status, count, articles in rows:
+            counts[status] = count
+            counts['articles'] += articles or 0
+        return counts
+
+    def failures(self, run_id):
+        """Returns (ticker, attempts, last_error, retryable) for every failed ticker of a run."""
+        return [
+            (ticker, attempts, last_error, bool(retryable))
+            for ticker, attempts, last_error, retryable in self._conn.execute(
+                "SELECT ticker, attempts, last_error, retryable FROM run_tickers WHERE run_id = ? AND status = ? ORDER BY position",
+                (run_id, FAILED),
+            )
+        ]
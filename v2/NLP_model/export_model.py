@@ -10,6 +10,8 @@
 # ROC AUC (macro)
 
 
+import os
+import sys
 import numpy as np
 import pickle
 from sklearn.linear_model import LogisticRegression
@@ -19,6 +21,11 @@ from sklearn.model_selection import train_test_split
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+# compact_model.py lives with the app that uses it
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "model-in-action"))
+from compact_model import export_compact
+from sentiment_service import COMPACT_MODEL_DIR, pickle_fingerprint
+
 # === Load Features ===
 data_path = r"C:\Users\ahmty\Desktop\HFU\6 Sechstesemester\NLP\project\prototype\v2\input\labeled_data\features\tfidf_features_labels.npz"
 data = np.load(data_path)
@@ -78,3 +85,16 @@ with open(model_save_path, 'wb') as f:
     pickle.dump(logreg, f)
 
 print(f"\nLogistic Regression model successfully saved to:\n{model_save_path}")
+
+# === Export the Compact Scoring Artifact ===
+# coef_, intercept_, the idf vector and the vocabulary as .npy files, scored with NumPy only.
+# Written straight into the app's model directory; the app uses it once the two pickles above are
+# copied next to it (until then the manifest's pickle hash doesn't match and the old pickles are used)
+vectorizer_path = r"C:\Users\ahmty\Desktop\HFU\6 Sechstesemester\NLP\project\prototype\v2\input\labeled_data\features\tfidf_vectorizer.pkl"
+compact_save_path = COMPACT_MODEL_DIR
+
+with open(vectorizer_path, 'rb') as f:
+    vectorizer = pickle.load(f)
+
+fingerprint = export_compact(logreg, vectorizer, compact_save_path, pickle_fingerprint(model_save_path, vectorizer_path))
+print(f"Compact model (fingerprint {fingerprint[:12]}) successfully saved to:\n{compact_save_path}")
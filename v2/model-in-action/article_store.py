@@ -0,0 +1,134 @@
+# File: article_store.py
+import hashlib
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+
+# === SETTINGS ===
+# The store lives next to the raw {ticker}_news.jsonl files it describes (see news_records.py)
+STORE_FILENAME = "article_store.db"
+
+
+def content_id(article):
+    # Identifies an article by what it says, with or without a link
+    key = article.get("headline", "") + "\n" + article.get("text", "")
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def article_id(article):
+    # Articles are identified by their link; items scraped without one fall back to their content
+    url = article.get("url")
+    if not url:
+        return content_id(article)
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def is_known(article, known_ids):
+    # Articles saved before links were scraped are only known by their content id, so an
+    # article is checked under both ids (see ArticleStore.known_ids)
+    return article_id(article) in known_ids or content_id(article) in known_ids
+
+
+class ArticleStore:
+    """Remembers, per ticker, which articles were already scraped and cleaned.
+
+    Lets repeat runs stop scraping at the first known articles and lets the cleaning
+    stage process only the articles it has not seen yet. Labels are not kept here: they
+    depend on the model, so SentimentPredictor caches them per model fingerprint.
+    """
+
+    def __init__(self, news_dir):
+        os.makedirs(news_dir, exist_ok=True)
+        self.path = os.path.join(news_dir, STORE_FILENAME)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    ticker TEXT NOT NULL,
+                    article_id TEXT NOT NULL,
+                    headline TEXT,
+                    text TEXT,
+                    url TEXT,
+                    scraped_at TEXT,
+                    cleaned_headline TEXT,
+                    cleaned_text TEXT,
+                    content_id TEXT,
+                    PRIMARY KEY (ticker, article_id)
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(articles)")}
+            if "content_id" not in columns:
+                # Stores created before content ids: add and fill the column
+                conn.execute("ALTER TABLE articles ADD COLUMN content_id TEXT")
+                rows = conn.execute("SELECT rowid, headline, text FROM articles").fetchall()
+                conn.executemany(
+                    "UPDATE articles SET content_id = ? WHERE rowid = ?",
+                    [(content_id({"headline": headline or "", "text": text or ""}), rowid) for rowid, headline, text in rows],
+                )
+            conn.execute("CREATE INDEX IF NOT EXISTS articles_by_content ON articles (ticker, content_id)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    # --- Scraping ---
+    def known_ids(self, ticker):
+        # Article ids and content ids of the ticker's stored articles (check with is_known)
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT article_id, content_id FROM articles WHERE ticker = ?", (ticker,))
+            return {key for row in rows for key in row if key}
+
+    def add_scraped(self, ticker, articles):
+        # Returns the articles that were not stored yet, neither under their id nor their content
+        scraped_at = datetime.now().isoformat()
+        new_articles = []
+        with closing(self._connect()) as conn, conn:
+            for article in articles:
+                article_content_id = content_id(article)
+                if conn.execute("SELECT 1 FROM articles WHERE ticker = ? AND content_id = ?",
+                                (ticker, article_content_id)).fetchone():
+                    continue
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO articles (ticker, article_id, headline, text, url, scraped_at, content_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (ticker, article_id(article), article.get("headline", ""), article.get("text", ""),
+                     article.get("url"), scraped_at, article_content_id),
+                )
+                if cursor.rowcount:
+                    new_articles.append(article)
+        return new_articles
+
+    def articles(self, ticker):
+        # All stored articles of a ticker, most recently scraped first
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT headline, text, url FROM articles WHERE ticker = ? ORDER BY scraped_at DESC, rowid",
+                (ticker,),
+            )
+            return [{"headline": headline, "text": text, "url": url} for headline, text, url in rows]
+
+    # --- Cleaning ---
+    def cleaned(self, ticker, article_ids=None):
+        # article_id -> {"headline", "text"} for every article of the ticker (or only the given
+        # articles) that was already cleaned
+        query = ("SELECT article_id, cleaned_headline, cleaned_text FROM articles "
+                 "WHERE ticker = ? AND cleaned_text IS NOT NULL")
+        with closing(self._connect()) as conn:
+            if article_ids is None:
+                rows = conn.execute(query, (ticker,))
+                return {aid: {"headline": headline, "text": text} for aid, headline, text in rows}
+
+            cleaned = {}
+            ids = list(article_ids)
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = conn.execute(f"{query} AND article_id IN ({','.join('?' * len(chunk))})", [ticker, *chunk])
+                cleaned.update((aid, {"headline": headline, "text": text}) for aid, headline, text in rows)
+            return cleaned
+
+    def save_cleaned(self, ticker, cleaned_by_id):
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "UPDATE articles SET cleaned_headline = ?, cleaned_text = ? WHERE ticker = ? AND article_id = ?",
+                [(entry["headline"], entry["text"], ticker, aid) for aid, entry in cleaned_by_id.items()],
+            )
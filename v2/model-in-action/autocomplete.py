@@ -0,0 +1,150 @@
+# File: autocomplete.py
+import bisect
+import tkinter as tk
+from tkinter import ttk
+
+
+# === SETTINGS ===
+MAX_SUGGESTIONS = 10
+# Keystrokes within this window are coalesced into one listbox update
+DEBOUNCE_MS = 120
+
+
+# === Prefix Index ===
+class PrefixIndex:
+    """Prefix search over ticker symbols and company names.
+
+    Both are kept as sorted arrays, so a lookup is two binary searches and
+    only the matches that are actually shown get touched.
+    """
+
+    def __init__(self, entries=()):
+        # entries: ticker strings, (symbol, name) pairs or {"symbol", "name"} dicts
+        names_by_symbol = {}
+        for entry in entries:
+            if isinstance(entry, str):
+                symbol, name = entry, ""
+            elif isinstance(entry, dict):
+                symbol, name = entry["symbol"], entry.get("name", "")
+            else:
+                symbol, name = entry
+            names_by_symbol[symbol.upper()] = name
+
+        self.names = names_by_symbol
+        self._symbols = sorted(names_by_symbol)
+        name_keys = sorted((name.upper(), symbol) for symbol, name in names_by_symbol.items() if name)
+        self._name_keys = [key for key, _ in name_keys]
+        self._name_symbols = [symbol for _, symbol in name_keys]
+
+    def __len__(self):
+        return len(self._symbols)
+
+    @staticmethod
+    def _prefix_range(keys, prefix):
+        return bisect.bisect_left(keys, prefix), bisect.bisect_left(keys, prefix + "\uffff")
+
+    def search(self, prefix, limit=MAX_SUGGESTIONS):
+        # Symbol matches first (alphabetical), then companies whose name starts with the prefix
+        prefix = prefix.upper()
+        start, stop = self._prefix_range(self._symbols, prefix)
+        matches = self._symbols[start:min(stop, start + limit)]
+
+        if len(matches) < limit and self._name_keys:
+            seen = set(matches)
+            start, stop = self._prefix_range(self._name_keys, prefix)
+            for symbol in self._name_symbols[start:stop]:
+                if len(matches) >= limit:
+                    break
+                if symbol not in seen:
+                    seen.add(symbol)
+                    matches.append(symbol)
+        return matches
+
+
+# === Autocomplete Entry Widget ===
+class AutocompleteEntry(ttk.Entry):
+    def __init__(self, autocomplete_list, *args, max_suggestions=MAX_SUGGESTIONS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_suggestions = max_suggestions
+        self.index = PrefixIndex(autocomplete_list)
+        self.var = self["textvariable"] = tk.StringVar()
+        self.var.trace_add("write", self.changed)
+        self.bind("<Right>", self.select_suggestion)
+        self.listbox = None
+        self._shown = []  # symbols currently in the listbox, in order
+        self._pending_update = None
+        self._suppress_change = False
+
+    def set_completions(self, autocomplete_list):
+        self.index = PrefixIndex(autocomplete_list)
+        if self.listbox:
+            # Labels may change with the new list, so redraw every row
+            self.listbox.delete(0, tk.END)
+            self._shown = []
+        if self.var.get():
+            self.changed()
+
+    def changed(self, *args):
+        if self._pending_update is not None:
+            self.after_cancel(self._pending_update)
+            self._pending_update = None
+        if self._suppress_change:
+            return
+        self._pending_update = self.after(DEBOUNCE_MS, self.update_suggestions)
+
+    def update_suggestions(self):
+        self._pending_update = None
+        value = self.var.get().strip().upper()
+        if value == "":
+            self.hide_listbox()
+            return
+
+        matches = self.index.search(value, self.max_suggestions)
+        if not matches:
+            self.hide_listbox()
+            return
+
+        if not self.listbox:
+            self.listbox = tk.Listbox(width=30, height=self.max_suggestions)
+            self.listbox.bind("<<ListboxSelect>>", self.on_select)
+            self.listbox.place(x=self.winfo_x(), y=self.winfo_y() + self.winfo_height())
+            self._shown = []
+
+        # Only touch the rows that differ from what is already shown
+        common = 0
+        for shown, match in zip(self._shown, matches):
+            if shown != match:
+                break
+            common += 1
+        if common < len(self._shown):
+            self.listbox.delete(common, tk.END)
+        for symbol in matches[common:]:
+            self.listbox.insert(tk.END, self._label(symbol))
+        self._shown = matches
+
+    def _label(self, symbol):
+        name = self.index.names.get(symbol)
+        return f"{symbol}  {name}" if name else symbol
+
+    def _choose(self, symbol):
+        self._suppress_change = True
+        try:
+            self.var.set(symbol)
+        finally:
+            self._suppress_change = False
+        self.icursor(tk.END)
+        self.hide_listbox()
+
+    def on_select(self, event):
+        if self.listbox and self.listbox.curselection():
+            self._choose(self._shown[self.listbox.curselection()[0]])
+
+    def select_suggestion(self, event):
+        if self.listbox and self._shown:
+            self._choose(self._shown[0])
+
+    def hide_listbox(self):
+        if self.listbox:
+            self.listbox.destroy()
+            self.listbox = None
+        self._shown = []
@@ -0,0 +1,135 @@
+# File: batch_analysis.py
+# Sentiment snapshot of many tickers at once (a sector or the whole S&P 500): the cleaned news of
+# every ticker is scored as one batch and counted per ticker with a single np.bincount, and the
+# result is one table.
+#
+# Usage:
+#   python batch_analysis.py AAPL MSFT NVDA
+#   python batch_analysis.py --sector "Information Technology"
+#   python batch_analysis.py --all --csv snapshot.csv
+#   python batch_analysis.py --sector Energy --charts   # also render every ticker's pie chart in parallel
+import csv
+import os
+import numpy as np
+from news_records import read_news
+from sentiment_service import LABEL_NAMES
+
+
+# === SETTINGS ===
+CLEANED_DIR = os.path.join("v2", "model-in-action", "cleansed-news")
+BEARISH, NEUTRAL, BULLISH = 0, 1, 2
+# Share of bullish (or bearish) articles above which the insight calls a direction
+INSIGHT_RATIO = 0.6
+
+
+# === Aggregation ===
+def sentiment_insight(bullish_ratio, bearish_ratio):
+    if bullish_ratio > INSIGHT_RATIO:
+        return "Sentiment is bullish — stock might increase."
+    if bearish_ratio > INSIGHT_RATIO:
+        return "Sentiment is bearish — stock might decline."
+    return "Mixed or neutral sentiment — no dramatic change expected."
+
+
+def count_by_group(labels, groups, n_groups, classes):
+    # (n_groups x n_classes) label counts: one bincount over the combined group/class index
+    n_classes = len(classes)
+    columns = np.searchsorted(classes, labels)
+    counts = np.bincount(groups * n_classes + columns, minlength=n_groups * n_classes)
+    return counts.reshape(n_groups, n_classes)
+
+
+def analyze_tickers(tickers, predictor, cleaned_dir=CLEANED_DIR):
+    """Scores the cleaned news of all tickers in one predictor call and summarizes it per ticker.
+
+    Returns one row per ticker (in the given order) with the article count, the count and ratio
+    of each class and the insight; tickers without cleaned news have zero articles.
+    """
+    texts = []
+    groups = []
+    for group, ticker in enumerate(tickers):
+        # An article counts once, even if an interrupted run wrote its cleaned record twice
+        seen_ids = set()
+        for record in read_news(cleaned_dir, ticker, cleaned=True):
+            if "text" not in record or record.get("id") in seen_ids:
+                continue
+            if record.get("id"):
+                seen_ids.add(record["id"])
+            texts.append(record["text"])
+            groups.append(group)
+
+    classes = np.asarray(predictor.classes())
+    labels = np.asarray(predictor.predict(texts), dtype=classes.dtype)
+    counts = count_by_group(labels, np.asarray(groups, dtype=np.int64), len(tickers), classes)
+    totals = counts.sum(axis=1)
+    ratios = counts / np.maximum(totals, 1)[:, None]
+
+    column = {int(label): i for i, label in enumerate(classes)}
+    rows = []
+    for i, ticker in enumerate(tickers):
+        row = {"ticker": ticker, "articles": int(totals[i])}
+        for label, j in column.items():
+            row[LABEL_NAMES.get(label, str(label))] = int(counts[i, j])
+        bullish_ratio = float(ratios[i, column[BULLISH]])
+        bearish_ratio = float(ratios[i, column[BEARISH]])
+        row["bullish_ratio"] = round(bullish_ratio, 3)
+        row["bearish_ratio"] = round(bearish_ratio, 3)
+        row["insight"] = sentiment_insight(bullish_ratio, bearish_ratio) if totals[i] else "No news found."
+        rows.append(row)
+    return rows
+
+
+# === Output ===
+def format_table(rows):
+    if not rows:
+        return "(no tickers)"
+    columns = list(rows[0])
+    widths = {name: max(len(name), *(len(str(row[name])) for row in rows)) for name in columns}
+    lines = ["  ".join(name.ljust(widths[name]) for name in columns),
+             "  ".join("-" * widths[name] for name in columns)]
+    lines.extend("  ".join(str(row[name]).ljust(widths[name]) for name in columns) for row in rows)
+    return "\n".join(line.rstrip() for line in lines)
+
+
+def write_csv(rows, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["ticker"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    import argparse
+    from sentiment_service import SentimentPredictor
+    from sp500_utils import get_sp500_constituents
+
+    parser = argparse.ArgumentParser(description="Sentiment snapshot of several tickers from their cleaned news.")
+    parser.add_argument("tickers", nargs="*", help="Ticker symbols.")
+    parser.add_argument("--sector", help="Every S&P 500 constituent of this GICS sector.")
+    parser.add_argument("--all", action="store_true", help="Every S&P 500 constituent.")
+    parser.add_argument("--cleaned-dir", default=CLEANED_DIR, help="Directory of *_news_cleaned.jsonl files.")
+    parser.add_argument("--csv", help="Also write the table to this CSV file.")
+    parser.add_argument("--skip-empty", action="store_true", help="Leave tickers without news out of the table.")
+    parser.add_argument("--charts", action="store_true", help="Render a pie chart per ticker with news (in parallel).")
+    parser.add_argument("--chart-workers", type=int, help="Chart rendering processes (default: one per CPU).")
+    args = parser.parse_args()
+
+    tickers = [ticker.upper() for ticker in args.tickers]
+    if args.sector or args.all:
+        tickers += [company["symbol"] for company in get_sp500_constituents()
+                    if args.all or company["sector"].lower() == args.sector.lower()]
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        parser.error("no tickers: pass symbols, --sector or --all")
+
+    rows = analyze_tickers(tickers, SentimentPredictor(), args.cleaned_dir)
+    if args.skip_empty:
+        rows = [row for row in rows if row["articles"]]
+    print(format_table(rows))
+    if args.csv:
+        write_csv(rows, args.csv)
+        print(f"[✓] Table written to {args.csv}")
+    if args.charts:
+        from chart_renderer import LABELS, render_charts
+        render_charts([(row["ticker"], [row[label] for label in LABELS]) for row in rows if row["articles"]],
+                      max_workers=args.chart_workers)
@@ -0,0 +1,96 @@
+# File: chart_renderer.py
+# Renders the sentiment pie charts off the analysis path: headless (Agg canvas, no pyplot and no
+# window), on a background thread for the GUI or a process pool for batches, and only when a
+# ticker's counts changed since its last chart.
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+# === SETTINGS ===
+CHART_DIR = os.path.join("v2", "model-in-action", "charts")
+# Fixed order and colors (0: Bearish, 1: Neutral, 2: Bullish)
+LABELS = ("Bearish", "Neutral", "Bullish")
+COLORS = ("red", "gray", "green")
+# Part of every chart's file name: bump it when the look of the chart changes, so cached charts are redrawn
+CHART_VERSION = "1"
+
+_background = None
+_background_lock = threading.Lock()
+
+
+def chart_path(ticker, values, chart_dir=CHART_DIR):
+    # The file name is derived from the counts, so unchanged counts map to the chart drawn before
+    key = json.dumps([CHART_VERSION, ticker, LABELS, COLORS, [int(value) for value in values]])
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(chart_dir, f"sentiment_distribution_{ticker}_{digest}.png")
+
+
+def render_chart(ticker, values, chart_dir=CHART_DIR):
+    # Returns the PNG of the ticker's counts, drawing it only if it does not exist yet
+    path = chart_path(ticker, values, chart_dir)
+    if os.path.exists(path):
+        return path
+
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figure = Figure(figsize=(6, 6))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.pie(values, labels=LABELS, autopct='%1.1f%%', colors=COLORS, startangle=140)
+    axes.set_title(f"Sentiment Distribution for {ticker}")
+    axes.axis('equal')
+    figure.tight_layout()
+
+    os.makedirs(chart_dir, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    figure.savefig(temp_path, format="png")
+    os.replace(temp_path, path)
+    return path
+
+
+def render_in_background(ticker, values, on_done, chart_dir=CHART_DIR):
+    # Renders on the chart thread and calls on_done(path) from it; the caller marshals it to its GUI
+    global _background
+    with _background_lock:
+        if _background is None:
+            _background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="charts")
+
+    def done(future):
+        try:
+            on_done(future.result())
+        except Exception as e:
+            print(f"[!] Chart for {ticker} failed:", e)
+
+    _background.submit(render_chart, ticker, values, chart_dir).add_done_callback(done)
+
+
+def _render_item(item):
+    ticker, values, chart_dir = item
+    return ticker, render_chart(ticker, values, chart_dir)
+
+
+def render_charts(items, chart_dir=CHART_DIR, max_workers=None):
+    """Renders the charts of many (ticker, values) pairs in parallel worker processes.
+
+    Charts whose counts are unchanged are not redrawn, and no process is started if none
+    changed. Returns ticker -> PNG path.
+    """
+    paths = {}
+    pending = []
+    for ticker, values in items:
+        path = chart_path(ticker, values, chart_dir)
+        if os.path.exists(path):
+            paths[ticker] = path
+        else:
+            pending.append((ticker, values, chart_dir))
+    if len(pending) == 1:
+        paths.update([_render_item(pending[0])])
+    elif pending:
+        with ProcessPoolExecutor(max_workers=min(max_workers or os.cpu_count() or 1, len(pending))) as executor:
+            paths.update(executor.map(_render_item, pending))
+    print(f"[✓] {len(pending)} chart(s) rendered, {len(paths) - len(pending)} unchanged.")
+    return paths
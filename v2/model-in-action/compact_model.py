@@ -0,0 +1,272 @@
+# File: compact_model.py
+# Scores cleaned texts with the exported TF-IDF + LogisticRegression model using NumPy only.
+# The weights, idf vector and vocabulary are plain .npy files that are memory-mapped on load,
+# so a scoring process neither imports scikit-learn nor unpickles its objects.
+# The vocabulary is a sorted array of UTF-8 terms searched with np.searchsorted instead of a
+# dict, so load time and memory stay flat for vocabularies of 100k+ n-grams.
+#
+# Usage:
+#   python compact_model.py export              # compact artifact from the pickles in model/
+#   python compact_model.py check [news_dir]    # compare with the pickled model on cleaned news
+import hashlib
+import json
+import os
+import re
+import numpy as np
+from sentiment_service import COMPACT_MODEL_DIR, MODEL_PATH, VECTORIZER_PATH, pickle_fingerprint
+
+
+# === SETTINGS ===
+# 2: vocabulary stored sorted, with the feature columns in the same order
+FORMAT_VERSION = 2
+# Written last by export_compact: a directory without it is not a complete artifact
+MANIFEST_NAME = "manifest.json"
+ARRAY_NAMES = ("coef", "intercept", "idf", "classes", "vocabulary")
+# Largest difference in features and class probabilities accepted by check_against_sklearn
+PROBABILITY_TOLERANCE = 1e-9
+
+
+# === Export ===
+def _vectorizer_config(vectorizer):
+    # The TfidfVectorizer settings the scorer reproduces; anything else is refused
+    params = vectorizer.get_params()
+    unsupported = [name for name in ("tokenizer", "preprocessor", "strip_accents", "stop_words") if params[name] is not None]
+    if params["analyzer"] != "word":
+        unsupported.append("analyzer")
+    if unsupported:
+        raise ValueError(f"Vectorizer settings not supported by the compact model: {', '.join(unsupported)}")
+    return {
+        "lowercase": params["lowercase"],
+        "token_pattern": params["token_pattern"],
+        "ngram_range": list(params["ngram_range"]),
+        "binary": params["binary"],
+        "sublinear_tf": params["sublinear_tf"],
+        "norm": params["norm"],
+    }
+
+
+def _multi_class(model):
+    # How predict_proba turns the decision values into probabilities
+    multi_class = getattr(model, "multi_class", "auto")
+    if multi_class in ("auto", "deprecated"):
+        return "ovr" if model.solver == "liblinear" or len(model.classes_) == 2 else "multinomial"
+    return multi_class
+
+
+def sorted_vocabulary(vectorizer):
+    # (UTF-8 terms in sorted order, vectorizer column of each): the compact model's column i is
+    # the vectorizer's column order[i]
+    terms = [None] * len(vectorizer.vocabulary_)
+    for term, column in vectorizer.vocabulary_.items():
+        terms[column] = term.encode("utf-8")
+    terms = np.array(terms, dtype=bytes)
+    order = np.argsort(terms, kind="stable")
+    return terms[order], order
+
+
+def export_compact(model, vectorizer, directory=COMPACT_MODEL_DIR, source=None):
+    """Writes a fitted LogisticRegression and TfidfVectorizer as .npy arrays plus a manifest.
+
+    source is the pickle_fingerprint of the pickles the two were saved to; SentimentPredictor
+    only uses the artifact while the pickles next to it still match. Returns the fingerprint
+    of the artifact, which changes whenever the weights or settings do.
+    """
+    config = _vectorizer_config(vectorizer)
+    config["multi_class"] = _multi_class(model)
+
+    vocabulary, order = sorted_vocabulary(vectorizer)
+    idf = vectorizer.idf_ if vectorizer.use_idf else np.ones(len(vocabulary))
+    arrays = {
+        "coef": np.ascontiguousarray(np.asarray(model.coef_, dtype=np.float64)[:, order]),
+        "intercept": np.ascontiguousarray(model.intercept_, dtype=np.float64),
+        "idf": np.ascontiguousarray(np.asarray(idf, dtype=np.float64)[order]),
+        "classes": np.asarray(model.classes_),
+        "vocabulary": vocabulary,
+    }
+
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha1(json.dumps(config, sort_keys=True).encode("utf-8"))
+    for name in ARRAY_NAMES:
+        np.save(os.path.join(directory, f"{name}.npy"), arrays[name], allow_pickle=False)
+        digest.update(arrays[name].tobytes())
+    config.update(format=FORMAT_VERSION, fingerprint=digest.hexdigest(), source=source or "")
+
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    return config["fingerprint"]
+
+
+def has_compact(directory=COMPACT_MODEL_DIR):
+    return os.path.exists(os.path.join(directory, MANIFEST_NAME))
+
+
+# === Scoring ===
+class CompactModel:
+    """TfidfVectorizer.transform followed by LogisticRegression, over memory-mapped arrays."""
+
+    def __init__(self, directory=COMPACT_MODEL_DIR):
+        with open(os.path.join(directory, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            config = json.load(f)
+        if config.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Compact model format {config.get('format')} is not supported (expected {FORMAT_VERSION})")
+        self.config = config
+        self.fingerprint = config["fingerprint"]
+
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r", allow_pickle=False)
+                  for name in ARRAY_NAMES}
+        self.coef = arrays["coef"]
+        self.intercept = arrays["intercept"]
+        self.idf = arrays["idf"]
+        self.classes_ = arrays["classes"]
+        self.vocabulary = arrays["vocabulary"]  # sorted UTF-8 terms; a term's position is its column
+        self.n_features = len(self.idf)
+
+        self._token_pattern = re.compile(config["token_pattern"])
+        self._min_n, self._max_n = config["ngram_range"]
+
+    def _terms(self, text):
+        # Same tokens and word n-grams as TfidfVectorizer's "word" analyzer
+        if self.config["lowercase"]:
+            text = text.lower()
+        tokens = self._token_pattern.findall(text)
+        if self._max_n == 1:
+            return tokens
+        terms = list(tokens) if self._min_n == 1 else []
+        for n in range(max(self._min_n, 2), min(self._max_n, len(tokens)) + 1):
+            terms.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return terms
+
+    def lookup(self, terms):
+        # Column of each term, -1 for terms outside the vocabulary (binary search in the sorted array)
+        encoded = [term.encode("utf-8") for term in terms]
+        if not encoded or not self.n_features:
+            return np.full(len(encoded), -1, dtype=np.int64)
+        # Same dtype as the vocabulary so the search does not copy it; terms longer than its
+        # width are truncated here and can never match
+        keys = np.array(encoded, dtype=self.vocabulary.dtype)
+        positions = np.searchsorted(self.vocabulary, keys)
+        positions[positions == self.n_features] = 0
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        found = (self.vocabulary[positions] == keys) & (lengths <= self.vocabulary.dtype.itemsize)
+        return np.where(found, positions, -1)
+
+    def transform(self, texts):
+        # TF-IDF of each text as sparse (row, column, value) arrays, one entry per distinct term
+        rows, terms = [], []
+        for row, text in enumerate(texts):
+            text_terms = self._terms(text)
+            terms.extend(text_terms)
+            rows.extend([row] * len(text_terms))
+        columns = self.lookup(terms)
+        known = columns >= 0
+        rows = np.asarray(rows, dtype=np.int64)[known]
+
+        keys, counts = np.unique(rows * self.n_features + columns[known], return_counts=True)
+        rows, columns = np.divmod(keys, self.n_features)
+        values = counts.astype(np.float64)
+        if self.config["binary"]:
+            values[:] = 1.0
+        elif self.config["sublinear_tf"]:
+            values = np.log(values) + 1.0
+        values *= self.idf[columns]
+
+        if self.config["norm"] in ("l1", "l2"):
+            weights = np.abs(values) if self.config["norm"] == "l1" else values ** 2
+            norms = np.bincount(rows, weights=weights, minlength=len(texts))
+            if self.config["norm"] == "l2":
+                norms = np.sqrt(norms)
+            values /= norms[rows]
+        return rows, columns, values
+
+    def decision_function(self, texts):
+        # (texts x coefficient rows) decision values: a sparse mat-vec per class
+        rows, columns, values = self.transform(texts)
+        scores = np.empty((len(texts), self.coef.shape[0]))
+        for k in range(self.coef.shape[0]):
+            scores[:, k] = np.bincount(rows, weights=self.coef[k, columns] * values, minlength=len(texts))
+        return scores + self.intercept
+
+    def _probabilities(self, scores):
+        if scores.shape[1] == 1:
+            positive = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+        if self.config["multi_class"] == "multinomial":
+            exp = np.exp(scores - scores.max(axis=1, keepdims=True))
+            return exp / exp.sum(axis=1, keepdims=True)
+        probabilities = 1.0 / (1.0 + np.exp(-scores))
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def _labels(self, scores):
+        if scores.shape[1] == 1:
+            return self.classes_[(scores[:, 0] > 0).astype(int)]
+        return self.classes_[scores.argmax(axis=1)]
+
+    def predict(self, texts):
+        return self._labels(self.decision_function(texts))
+
+    def predict_proba(self, texts):
+        return self._probabilities(self.decision_function(texts))
+
+    def predict_with_proba(self, texts):
+        # (labels, probabilities) from a single pass over the texts
+        scores = self.decision_function(texts)
+        return self._labels(scores), self._probabilities(scores)
+
+
+# === Check ===
+def check_against_sklearn(texts, directory=COMPACT_MODEL_DIR, model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH):
+    # Compares labels and probabilities with the pickled model; returns True if they agree
+    import pickle
+
+    with open(vectorizer_path, "rb") as f:
+        vectorizer = pickle.load(f)
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+    X = vectorizer.transform(texts)
+    expected_labels, expected_probabilities = model.predict(X), model.predict_proba(X)
+
+    compact = CompactModel(directory)
+    # Features first: the same TF-IDF values, in the compact model's sorted column order
+    rows, columns, values = compact.transform(texts)
+    features = np.zeros((len(texts), compact.n_features))
+    features[rows, columns] = values
+    feature_difference = float(np.abs(features - X[:, sorted_vocabulary(vectorizer)[1]].toarray()).max()) if len(texts) else 0.0
+
+    labels, probabilities = compact.predict_with_proba(texts)
+    mismatches = int((labels != expected_labels).sum())
+    max_difference = float(np.abs(probabilities - expected_probabilities).max()) if len(texts) else 0.0
+    print(f"[•] {len(texts)} texts: max feature difference {feature_difference:.2e}, {mismatches} label mismatch(es), "
+          f"max probability difference {max_difference:.2e} (tolerance {PROBABILITY_TOLERANCE:.0e})")
+    return feature_difference <= PROBABILITY_TOLERANCE and mismatches == 0 and max_difference <= PROBABILITY_TOLERANCE
+
+
+if __name__ == "__main__":
+    import argparse
+    import pickle
+    import sys
+    from news_records import list_tickers, read_news
+
+    parser = argparse.ArgumentParser(description="Export or check the NumPy-only scoring artifact.")
+    parser.add_argument("--model", default=MODEL_PATH, help="Pickled classifier.")
+    parser.add_argument("--vectorizer", default=VECTORIZER_PATH, help="Pickled TF-IDF vectorizer.")
+    parser.add_argument("--output", default=COMPACT_MODEL_DIR, help="Directory of the compact artifact.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("export", help="Write the compact artifact from the pickled model and vectorizer.")
+    check_parser = commands.add_parser("check", help="Compare the compact artifact with the pickled model.")
+    check_parser.add_argument("news_dir", nargs="?", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "cleansed-news"),
+                              help="Directory of *_news_cleaned.jsonl files to score.")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        with open(args.vectorizer, "rb") as f:
+            vectorizer = pickle.load(f)
+        with open(args.model, "rb") as f:
+            model = pickle.load(f)
+        fingerprint = export_compact(model, vectorizer, args.output, pickle_fingerprint(args.model, args.vectorizer))
+        print(f"[✓] Compact model written to {args.output} (fingerprint {fingerprint[:12]})")
+    else:
+        texts = [record["text"] for ticker in list_tickers(args.news_dir, cleaned=True)
+                 for record in read_news(args.news_dir, ticker, cleaned=True) if "text" in record]
+        sys.exit(0 if check_against_sklearn(texts, args.output, args.model, args.vectorizer) else 1)
@@ -0,0 +1,57 @@
+# File: embedded_stories.py
+# Reads the story stream of a Yahoo Finance news page from the JSON payload the page embeds,
+# without walking its DOM. Shared by the v1 requests scraper and the v2 Selenium scrapers.
+import json
+import re
+
+
+# Yahoo embeds the data its page was rendered from in <script type="application/json"> tags
+EMBEDDED_JSON_SCRIPT = re.compile(r'<script[^>]*type="application/json"[^>]*>(.*?)</script>', re.DOTALL)
+
+
+def _iter_story_contents(node):
+    # Every dictionary of a decoded payload that looks like a story's content
+    if isinstance(node, dict):
+        if isinstance(node.get("title"), str) and ("canonicalUrl" in node or "clickThroughUrl" in node):
+            yield node
+            return
+        for value in node.values():
+            yield from _iter_story_contents(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _iter_story_contents(value)
+
+
+def extract_embedded_stories(html):
+    """Returns the story stream of a page as headline/text/url/source/published records.
+
+    "published" is the ISO publication date (or "N/A"). The records are in page order and
+    without duplicates; a page without a recognisable story payload gives [].
+    """
+    stories = []
+    seen_urls = set()
+    for match in EMBEDDED_JSON_SCRIPT.finditer(html):
+        payload = match.group(1)
+        if "pubDate" not in payload:
+            continue  # only story payloads carry publication dates
+        try:
+            data = json.loads(payload)
+            # Fetched responses are embedded with their JSON body as a string
+            if isinstance(data, dict) and isinstance(data.get("body"), str):
+                data = json.loads(data["body"])
+        except ValueError:
+            continue
+
+        for content in _iter_story_contents(data):
+            link = (content.get("canonicalUrl") or content.get("clickThroughUrl") or {}).get("url")
+            if not link or link in seen_urls:
+                continue
+            seen_urls.add(link)
+            stories.append({
+                "headline": content["title"].strip(),
+                "text": (content.get("summary") or content.get("description") or "").strip(),
+                "url": link,
+                "source": (content.get("provider") or {}).get("displayName") or "N/A",
+                "published": content.get("pubDate") or "N/A",
+            })
+    return stories
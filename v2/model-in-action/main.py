@@ -1,159 +1,227 @@
-import pandas as pd
 import tkinter as tk
-from tkinter import ttk
-import subprocess
-import json
-import os
-import pickle
-from news_cleaner import clean_news_file
-from collections import Counter
-import matplotlib.pyplot as plt
-import datetime
+import threading
+import queue
+from sp500_utils import get_sp500_constituents
+from autocomplete import AutocompleteEntry
+from sentiment_service import SentimentPredictor
+from chart_renderer import LABELS, render_in_background
+
+# The pipeline (selenium, spaCy), NumPy and matplotlib are imported where they are first used,
+# so the window opens without paying for them. Charts are drawn headless on their own thread.
 
 
 # === SETTINGS ===
 CLEANSING_OUTPUT_DIR = r"C:\Users\ahmty\Desktop\HFU\6 Sechstesemester\NLP\project\prototype\v2\model-in-action\cleansed-news"
 MODEL_PATH = r"C:\Users\ahmty\Desktop\HFU\6 Sechstesemester\NLP\project\prototype\v2\model-in-action\model\exported_model_logreg.pkl"
 VECTORIZER_PATH = r"C:\Users\ahmty\Desktop\HFU\6 Sechstesemester\NLP\project\prototype\v2\model-in-action\model\tfidf_vectorizer.pkl"
-
-# === Get the list of S&P 500 tickers ===
-def get_sp500_tickers():
-    url = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
-    tables = pd.read_html(url)
-    sp500_table = tables[0]
-    tickers = sp500_table['Symbol'].tolist()
-    return tickers
-
-# === Autocomplete Entry Widget ===
-class AutocompleteEntry(ttk.Entry):
-    def __init__(self, autocomplete_list, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.autocomplete_list = autocomplete_list
-        self.var = self["textvariable"] = tk.StringVar()
-        self.var.trace_add("write", self.changed)
-        self.bind("<Right>", self.select_suggestion)
-        self.listbox = None
-
-    def changed(self, *args):
-        value = self.var.get().upper()
-        if value == "":
-            self.hide_listbox()
-            return
-
-        matches = [s for s in self.autocomplete_list if s.startswith(value)]
-        if matches:
-            if not self.listbox:
-                self.listbox = tk.Listbox(width=15)
-                self.listbox.bind("<<ListboxSelect>>", self.on_select)
-                self.listbox.place(x=self.winfo_x(), y=self.winfo_y() + self.winfo_height())
-            self.listbox.delete(0, tk.END)
-            for match in matches:
-                self.listbox.insert(tk.END, match)
-        else:
-            self.hide_listbox()
-
-    def on_select(self, event):
-        if self.listbox:
-            selection = self.listbox.get(self.listbox.curselection())
-            self.var.set(selection)
-            self.hide_listbox()
-
-    def select_suggestion(self, event):
-        if self.listbox and self.listbox.size() > 0:
-            self.var.set(self.listbox.get(0))
-            self.hide_listbox()
-
-    def hide_listbox(self):
-        if self.listbox:
-            self.listbox.destroy()
-            self.listbox = None
-
-# === Run Scraper and Cleaner ===
-def run_scraper(ticker):
-    if ticker:
-        print(f"[•] Running news scraper for {ticker}...")
-        subprocess.run(["python", r"C:\Users\ahmty\Desktop\HFU\6 Sechstesemester\NLP\project\prototype\v2\model-in-action\news_scraper_input.py", ticker])
-        print(f"[•] Cleaning scraped news for {ticker}...")
-        clean_news_file(ticker, output_dir=CLEANSING_OUTPUT_DIR)
-        print("[✓] Cleansing complete. Running prediction...")
-        run_prediction(ticker)  # Pass ticker here
-    else:
-        print("Please enter a ticker.")
-
-# === Run Prediction and Show Results ===
+COMPACT_MODEL_DIR = r"C:\Users\ahmty\Desktop\HFU\6 Sechstesemester\NLP\project\prototype\v2\model-in-action\model\compact"
+
+# Created on first use (see get_predictor) and then kept for every later analysis
+_predictor = None
+_predictor_lock = threading.Lock()
+
+def get_predictor():
+    # The model (the compact one if it was exported) and the prediction cache are only opened by
+    # the first analysis, not when the window starts
+    global _predictor
+    with _predictor_lock:
+        if _predictor is None:
+            _predictor = SentimentPredictor(MODEL_PATH, VECTORIZER_PATH, compact_dir=COMPACT_MODEL_DIR)
+    return _predictor
+
+# Analyses running at the same time, each with its own browser session (news_scraper_input.POOL_SIZE)
+ANALYSIS_WORKERS = 2
+
+# === Run Scraper, Cleaner and Model ===
+def run_scraper(ticker, on_progress=None, cancelled=None):
+    # Runs on a worker thread (see AnalysisQueue); returns the result of run_prediction
+    from news_pipeline import run_pipeline
+    # New articles are cleaned and scored while the scraper is still collecting more
+    print(f"[•] Scraping, cleaning and scoring news for {ticker}...")
+    run_pipeline(ticker, get_predictor(), cleaned_dir=CLEANSING_OUTPUT_DIR, on_progress=on_progress, cancelled=cancelled)
+    print("[✓] Pipeline complete. Running prediction...")
+    return run_prediction(ticker)  # Pass ticker here
+
+# === Run Prediction ===
 def run_prediction(ticker):  # Accept ticker as an argument
-    with open(MODEL_PATH, "rb") as f:
-        model = pickle.load(f)
-    with open(VECTORIZER_PATH, "rb") as f:
-        vectorizer = pickle.load(f)
-
-    all_texts = []
-    for filename in os.listdir(CLEANSING_OUTPUT_DIR):
-        if filename.endswith(".json"):
-            with open(os.path.join(CLEANSING_OUTPUT_DIR, filename), encoding="utf-8") as f:
-                news_items = json.load(f)
-                all_texts += [item["text"] for item in news_items if "text" in item]
-
-    if not all_texts:
-        print("No news found for prediction.")
-        return
-
-    X = vectorizer.transform(all_texts)
-    preds = model.predict(X)
-
-    counts = Counter(preds)
-    label_map = {0: "Bearish", 1: "Neutral", 2: "Bullish"}
-    label_names = [label_map[i] for i in preds]
-
-    # Define the fixed color mapping for sentiment
-    color_map = {0: "red", 1: "gray", 2: "green"}
-
-    # Create the list of labels and their corresponding colors
-    labels = [label_map[0], label_map[1], label_map[2]]
-    colors = [color_map[0], color_map[1], color_map[2]]
-
-    # Count the occurrences of each sentiment type (0: Bearish, 1: Neutral, 2: Bullish)
-    values = [label_names.count(label_map[0]), label_names.count(label_map[1]), label_names.count(label_map[2])]
-
-
-    # Insight
-    total = sum(counts.values())
-    bullish_ratio = counts.get(2, 0) / total
-    bearish_ratio = counts.get(0, 0) / total
-
+    # Scores all of the ticker's cleaned news; returns the sentiment counts and insight for the
+    # GUI, or None if there is no news. Safe to call from a worker thread.
+    # Only the ticker's own cleaned file is read: {ticker}_news_cleaned.jsonl holds exactly its
+    # records, so the cost grows with the ticker's articles, not with the whole archive.
+    # Texts this model scored before come from the prediction cache; only the rest is vectorized
+    from batch_analysis import analyze_tickers
+    predictor = get_predictor()
+    hits, misses = predictor.hits, predictor.misses
+    row = analyze_tickers([ticker], predictor, CLEANSING_OUTPUT_DIR)[0]
+    if not row["articles"]:
+        print(f"No news found for prediction for {ticker}.")
+        return None
+    print(f"[•] Scored {predictor.misses - misses} new of {row['articles']} articles "
+          f"({predictor.hits - hits} from the prediction cache).")
+
+    # Counts in the chart's fixed order (0: Bearish, 1: Neutral, 2: Bullish)
+    values = [row[label] for label in LABELS]
+
+    insight = row["insight"]
     print("\nInsight:")
-    if bullish_ratio > 0.6:
-        print("Sentiment is bullish — stock might increase.")
-    elif bearish_ratio > 0.6:
-        print("Sentiment is bearish — stock might decline.")
-    else:
-        print("Mixed or neutral sentiment — no dramatic change expected.")
-
-
-    # Pie chart with fixed colors
-    plt.figure(figsize=(6, 6))
-    plt.pie(values, labels=labels, autopct='%1.1f%%', colors=colors, startangle=140)
-    plt.title(f"Sentiment Distribution for {ticker}")  # Include ticker in the title
-    plt.axis('equal')
-    plt.tight_layout()
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    plt.savefig(f"v2/model-in-action/charts/sentiment_distribution_{ticker}_{timestamp}.png")
-    plt.show()
+    print(insight)
+
+    return {"ticker": ticker, "values": values, "insight": insight}
+
+# === Show Results ===
+def show_chart(root, ticker, path):
+    # Shows a chart rendered by chart_renderer in its own window (Tk thread; no matplotlib here)
+    window = tk.Toplevel(root)
+    window.title(f"Sentiment Distribution for {ticker}")
+    image = tk.PhotoImage(file=path)
+    label = tk.Label(window, image=image)
+    label.image = image  # keep a reference, or Tk drops the image
+    label.pack()
+
+# === Background Analyses ===
+class AnalysisQueue:
+    """Runs queued ticker analyses on worker threads so the window never waits for them.
+
+    The workers never touch widgets: every status change is handed to on_status(ticker, status,
+    detail) and every finished analysis to on_result(result) through root.after, on the Tk thread.
+    """
+
+    def __init__(self, root, on_status, on_result, workers=ANALYSIS_WORKERS):
+        self.root = root
+        self.on_status = on_status
+        self.on_result = on_result
+        self.jobs = queue.Queue()
+        self.cancel_events = {}  # ticker -> threading.Event, while queued or running
+        self._lock = threading.Lock()
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f"analysis-{i}", daemon=True).start()
+
+    def submit(self, ticker):
+        # False if the ticker is already queued or running
+        with self._lock:
+            if ticker in self.cancel_events:
+                return False
+            self.cancel_events[ticker] = threading.Event()
+        self.jobs.put(ticker)
+        self._post(self.on_status, ticker, "queued", "")
+        return True
+
+    def cancel(self, ticker=None):
+        # Cancels one ticker, or every queued and running one; a running pipeline stops at its next article
+        with self._lock:
+            if ticker is None:
+                events = dict(self.cancel_events)
+            else:
+                events = {ticker: self.cancel_events[ticker]} if ticker in self.cancel_events else {}
+        for cancelled_ticker, event in events.items():
+            event.set()
+            self._post(self.on_status, cancelled_ticker, "cancelling", "")
+
+    def _post(self, callback, *args):
+        # The only way results leave a worker thread
+        self.root.after(0, callback, *args)
+
+    def _work(self):
+        from news_pipeline import PipelineCancelled
+
+        while True:
+            ticker = self.jobs.get()
+            with self._lock:
+                cancelled = self.cancel_events[ticker]
+            progress = {}  # stage -> articles so far, e.g. {"scraped": 12, "cleaned": 8}
+
+            def on_progress(stage, count, ticker=ticker, progress=progress):
+                progress[stage] = count
+                self._post(self.on_status, ticker, "running", ", ".join(f"{n} {name}" for name, n in progress.items()))
+
+            try:
+                if cancelled.is_set():
+                    raise PipelineCancelled(ticker)
+                self._post(self.on_status, ticker, "running", "starting")
+                result = run_scraper(ticker, on_progress=on_progress, cancelled=cancelled)
+                if result is None:
+                    self._post(self.on_status, ticker, "done", "no news found")
+                else:
+                    self._post(self.on_status, ticker, "done", result["insight"])
+                    self._post(self.on_result, result)
+            except PipelineCancelled:
+                self._post(self.on_status, ticker, "cancelled", "")
+            except Exception as e:
+                print(f"[!] Analysis failed for {ticker}:", e)
+                self._post(self.on_status, ticker, "failed", str(e))
+            finally:
+                with self._lock:
+                    del self.cancel_events[ticker]
 
 # === GUI ===
+def warm_up_scraper():
+    from news_scraper_input import get_driver_pool
+    get_driver_pool().warm_up()
+
 def main():
     root = tk.Tk()
     root.title("Stock News Sentiment Analyzer")
-    root.geometry("300x200")
-
-    sp500_tickers = get_sp500_tickers()
+    root.geometry("480x360")
 
     tk.Label(root, text="Enter Ticker Symbol:").pack(pady=10)
-    entry = AutocompleteEntry(sp500_tickers, root)
+    entry = AutocompleteEntry([], root)
     entry.pack()
 
-    button = tk.Button(root, text="Analyze News", command=lambda: run_scraper(entry.get()))
-    button.pack(pady=20)
+    # Served from the on-disk cache; a missing or stale cache is refreshed in the background
+    sp500_companies = get_sp500_constituents(
+        block_if_missing=False,
+        on_refresh=lambda constituents: root.after(0, entry.set_completions, constituents),
+    )
+    entry.set_completions(sp500_companies)
+
+    # Launch the browser sessions while the user is still typing
+    threading.Thread(target=warm_up_scraper, daemon=True).start()
+
+    # One row per analysed ticker: "AAPL  running  12 scraped"
+    tk.Label(root, text="Analyses (select one to cancel it):").pack()
+    status_list = tk.Listbox(root, width=60, height=8, exportselection=False)
+    rows = []  # tickers, in the order of the listbox rows
+
+    def on_status(ticker, status, detail):
+        line = f"{ticker:<8} {status:<10} {detail}"
+        if ticker in rows:
+            row = rows.index(ticker)
+            selected = status_list.curselection() == (row,)
+            status_list.delete(row)
+            status_list.insert(row, line)
+            if selected:
+                status_list.selection_set(row)
+        else:
+            rows.append(ticker)
+            status_list.insert(tk.END, line)
+
+    # Charts are an optional last stage: the numbers are shown first, the chart when it is drawn
+    show_charts = tk.BooleanVar(value=True)
+
+    def on_result(result):
+        if show_charts.get():
+            ticker = result["ticker"]
+            render_in_background(ticker, result["values"], lambda path: root.after(0, show_chart, root, ticker, path))
+
+    analyses = AnalysisQueue(root, on_status, on_result)
+
+    def analyze():
+        ticker = entry.get().strip().upper()
+        if not ticker:
+            print("Please enter a ticker.")
+            return
+        analyses.submit(ticker)
+
+    def cancel():
+        selection = status_list.curselection()
+        analyses.cancel(rows[selection[0]] if selection else None)
+
+    buttons = tk.Frame(root)
+    tk.Button(buttons, text="Analyze News", command=analyze).pack(side=tk.LEFT, padx=5)
+    tk.Button(buttons, text="Cancel", command=cancel).pack(side=tk.LEFT, padx=5)
+    tk.Checkbutton(buttons, text="Show chart", variable=show_charts).pack(side=tk.LEFT, padx=5)
+    buttons.pack(pady=10)
+    status_list.pack(padx=10, pady=(0, 10), fill=tk.BOTH, expand=True)
 
     root.mainloop()
 
@@ -1,19 +1,56 @@
 # File: news_cleaner.py
-import json
+import hashlib
+import itertools
 import re
 import os
-import nltk
-import spacy
-from nltk.corpus import stopwords
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing
+from article_store import ArticleStore, article_id
+from news_records import append_records, convert_file, existing_news_path, list_tickers, news_path, read_news
 
-# Download NLTK stopwords if not already available
-nltk.download('stopwords')
+# Raw {ticker}_news.jsonl files written by news_scraper_input.py
+NEWS_DIR = os.path.join("v2", "model-in-action", "cleansed-news")
 
-# Load spaCy model for lemmatization
-nlp = spacy.load("en_core_web_sm")
+# === SETTINGS ===
+# Texts per nlp.pipe batch, and worker processes for cleaning (1 = in-process).
+# More processes only pay off for large batches: each worker loads its own copy of the model.
+BATCH_SIZE = 256
+N_PROCESS = 1
+# Articles read from a news file at a time, so memory does not grow with the size of the file
+ARTICLES_PER_CHUNK = 1000
+
+# NLTK's English stopword list (nltk_data corpora/stopwords/english), vendored so that
+# importing the cleaner neither needs NLTK nor checks for a download on every start
+NLTK_ENGLISH_STOPWORDS = frozenset("""
+a about above after again against ain all am an and any are aren aren't as at be because been
+before being below between both but by can couldn couldn't d did didn didn't do does doesn
+doesn't doing don don't down during each few for from further had hadn hadn't has hasn hasn't
+have haven haven't having he he'd he'll he's her here hers herself him himself his how i i'd
+i'll i'm i've if in into is isn isn't it it'd it'll it's its itself just ll m ma me mightn
+mightn't more most mustn mustn't my myself needn needn't no nor not now o of off on once only or
+other our ours ourselves out over own re s same shan shan't she she'd she'll she's should
+should've shouldn shouldn't so some such t than that that'll the their theirs them themselves
+then there these they they'd they'll they're they've this those through to too under until up
+ve very was wasn wasn't we we'd we'll we're we've were weren weren't what when where which while
+who whom why will with won won't wouldn wouldn't y you you'd you'll you're you've your yours
+yourself yourselves
+""".split())
+
+# spaCy model for lemmatization, loaded on first use (see _get_nlp)
+_nlp = None
+
+def _get_nlp():
+    # Only the lemmas (and is_punct / is_space) are used: the lemmatizer needs the tagger and
+    # attribute_ruler for POS, but the parser and NER are never used, so they are not loaded.
+    global _nlp
+    if _nlp is None:
+        import spacy
+        _nlp = spacy.load("en_core_web_sm", exclude=["parser", "ner"])
+    return _nlp
 
 # Define combined stopwords (English + financial domain)
-english_stopwords = set(stopwords.words('english'))
+english_stopwords = NLTK_ENGLISH_STOPWORDS
 finance_stopwords = {
     "stock", "market", "share", "shares", "trading", "trader", "stocks",
     "equity", "equities", "bond", "bonds", "portfolio", "investment",
@@ -22,15 +59,14 @@ finance_stopwords = {
 }
 combined_stopwords = english_stopwords.union(finance_stopwords)
 
-def clean_text(text):
+def _normalize(text):
     # Lowercase the text
     text = text.lower()
 
     # Remove non-alphanumerics except finance-related symbols
-    text = re.sub(r"[^a-z0-9%\$.,\-\(\)\s]", " ", text)
+    return re.sub(r"[^a-z0-9%\$.,\-\(\)\s]", " ", text)
 
-    # Tokenize and lemmatize
-    doc = nlp(text)
+def _join_lemmas(doc):
     lemmatized_words = [
         token.lemma_ for token in doc
         if token.lemma_ not in combined_stopwords and not token.is_punct and not token.is_space
@@ -41,31 +77,241 @@ def clean_text(text):
     cleaned = re.sub(r"\s+", " ", cleaned).strip()
     return cleaned
 
-def clean_news_file(ticker, output_dir=None):
-    input_path = os.path.join("v2", "model-in-action", "cleansed-news", f"{ticker}_news.json")
+def warm_up():
+    # Loads spaCy ahead of the first clean_texts call
+    _get_nlp()
+
+# === Cleaning Cache ===
+# The same syndicated article shows up under several tickers and again in every run, so cleaned
+# texts are cached by the hash of the raw text. Bump CLEANER_VERSION whenever the output changes
+# (normalization, stopwords, spaCy model): entries of the old version are then never hit again.
+CLEANER_VERSION = "2"
+# Shared by every copy of the cleaner, like the S&P 500 cache in sp500_utils.py
+CLEAN_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "news_cleaner", "clean_cache.db")
+
+def cache_key(text):
+    return hashlib.sha1(f"{CLEANER_VERSION}\n{text}".encode("utf-8")).hexdigest()
+
+class CleanCache:
+    """Cleaned text by cache_key of the raw text, in SQLite."""
+
+    def __init__(self, path=CLEAN_CACHE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS cleaned (key TEXT PRIMARY KEY, text TEXT NOT NULL)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_many(self, keys):
+        # key -> cleaned text for the keys that are cached
+        found = {}
+        keys = list(keys)
+        with closing(self._connect()) as conn:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = conn.execute(f"SELECT key, text FROM cleaned WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+                found.update(rows)
+        return found
+
+    def put_many(self, cleaned_by_key):
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO cleaned (key, text) VALUES (?, ?)", cleaned_by_key.items())
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+_clean_cache = None
+
+def get_clean_cache():
+    global _clean_cache
+    if _clean_cache is None:
+        _clean_cache = CleanCache()
+    return _clean_cache
+
+def clean_text(text):
+    # Tokenize and lemmatize a single text (use clean_texts for many)
+    return clean_texts([text])[0]
+
+def clean_texts(texts, batch_size=BATCH_SIZE, n_process=N_PROCESS):
+    # Same result as [clean_text(t) for t in texts]. Cached texts are not touched by spaCy at all;
+    # each distinct uncached text is cleaned once and added to the cache
+    cache = get_clean_cache()
+    keys = [cache_key(text) for text in texts]
+    cleaned_by_key = cache.get_many(set(keys))
+
+    uncached = {}
+    for key, text in zip(keys, texts):
+        if key not in cleaned_by_key:
+            uncached.setdefault(key, text)
+    if uncached:
+        fresh = dict(zip(uncached, _clean_with_spacy(list(uncached.values()), batch_size, n_process)))
+        cache.put_many(fresh)
+        cleaned_by_key.update(fresh)
 
+    cache.misses += len(uncached)
+    cache.hits += len(texts) - len(uncached)
+    return [cleaned_by_key[key] for key in keys]
+
+def _clean_with_spacy(texts, batch_size=BATCH_SIZE, n_process=N_PROCESS):
+    # Streams the texts through nlp.pipe in batches
+    docs = _get_nlp().pipe((_normalize(text) for text in texts), batch_size=batch_size, n_process=n_process)
+    return [_join_lemmas(doc) for doc in docs]
+
+def clean_news_file(ticker, output_dir=None, news_dir=None, force=False, batch_size=BATCH_SIZE, n_process=N_PROCESS):
+    # Cleans the articles of {ticker}_news.jsonl that are not in {ticker}_news_cleaned.jsonl yet and
+    # appends them to it; returns how many articles were cleaned. force rebuilds the cleaned file and
+    # re-cleans every article (e.g. after a CLEANER_VERSION bump) instead of reusing earlier results
+    if news_dir is None:
+        news_dir = NEWS_DIR
     if output_dir is None:
-        output_dir = os.path.join("v2", "model-in-action", "cleansed-news")
+        output_dir = news_dir
     os.makedirs(output_dir, exist_ok=True)
 
-    output_path = os.path.join(output_dir, f"{ticker}_news_cleaned.json")
+    output_path = news_path(output_dir, ticker, cleaned=True)
+    convert_file(output_dir, ticker, cleaned=True)
+
+    # Articles already in the cleaned file are skipped; files written before cleaned records carried
+    # an id cannot be matched and are rebuilt
+    done_ids = set()
+    if not force:
+        for record in read_news(output_dir, ticker, cleaned=True):
+            if "id" not in record:
+                force = True
+                done_ids = set()
+                break
+            done_ids.add(record["id"])
+    # A rebuild streams into a temporary file that replaces the old one at the end
+    target_path = f"{output_path}.{os.getpid()}.tmp" if force else output_path
+
+    # Clean headlines and texts chunk by chunk, reusing the stored result of articles cleaned in earlier runs
+    store = ArticleStore(news_dir)
+    cache = get_clean_cache()
+    hits, misses = cache.hits, cache.misses
+    total_cleaned = 0
+    total_written = 0
+    records = read_news(news_dir, ticker)
+    while True:
+        chunk = list(itertools.islice(records, ARTICLES_PER_CHUNK))
+        if not chunk:
+            break
+        store.add_scraped(ticker, chunk)
+
+        new_entries = {}
+        for entry in chunk:
+            aid = article_id(entry)
+            if aid not in done_ids:
+                new_entries.setdefault(aid, entry)
+        done_ids.update(new_entries)
+        cleaned_by_id = {} if force else store.cleaned(ticker, new_entries)
+        pending = [aid for aid in new_entries if aid not in cleaned_by_id]
+
+        # Headlines and texts of all pending articles go through spaCy as one stream
+        texts = []
+        for aid in pending:
+            texts.append(new_entries[aid].get("headline", ""))
+            texts.append(new_entries[aid].get("text", ""))
+        cleaned_texts = clean_texts(texts, batch_size=batch_size, n_process=n_process)
+
+        newly_cleaned = {}
+        for i, aid in enumerate(pending):
+            cleaned_by_id[aid] = newly_cleaned[aid] = {
+                "headline": cleaned_texts[2 * i],
+                "text": cleaned_texts[2 * i + 1]
+            }
+        store.save_cleaned(ticker, newly_cleaned)
+
+        total_cleaned += len(newly_cleaned)
+        total_written += append_records(target_path, ({"id": aid, **cleaned_by_id[aid]} for aid in new_entries))
+
+    if force:
+        if total_written:
+            os.replace(target_path, output_path)
+        elif os.path.exists(output_path):
+            os.remove(output_path)
+    # Marks the cleaned file as up to date with its source (see is_up_to_date), also when
+    # no article was new and nothing was appended
+    if os.path.exists(output_path):
+        os.utime(output_path)
+
+    hits, misses = cache.hits - hits, cache.misses - misses
+    print(f"[✓] Cleaning complete ({total_cleaned} articles cleaned, {total_written} added to the cleaned file, "
+          f"{hits} of {hits + misses} texts from the cleaning cache). Output: {output_path}")
+    return total_cleaned
+
+# === Bulk Cleaning ===
+def is_up_to_date(source_path, output_path):
+    # Make-style check: the cleaned file exists and is not older than its source
+    try:
+        return os.path.getmtime(output_path) >= os.path.getmtime(source_path)
+    except OSError:
+        return False
+
+def _init_worker():
+    # Each worker process loads spaCy once and keeps it warm for every file it cleans
+    warm_up()
+
+def _clean_file_worker(ticker, news_dir, output_dir, force):
+    return clean_news_file(ticker, output_dir=output_dir, news_dir=news_dir, force=force, n_process=1)
+
+def clean_news_dir(news_dir=NEWS_DIR, output_dir=None, max_workers=None, force=False):
+    # Cleans every {ticker}_news.jsonl in news_dir whose cleaned file is missing or out of date,
+    # spread over a pool of worker processes (max_workers defaults to the number of CPUs)
+    if output_dir is None:
+        output_dir = news_dir
+
+    stale = []
+    for ticker in list_tickers(news_dir):
+        source_path = existing_news_path(news_dir, ticker)
+        output_path = existing_news_path(output_dir, ticker, cleaned=True)
+        if force or output_path is None or not is_up_to_date(source_path, output_path):
+            stale.append((os.path.getsize(source_path), ticker))
+    # Largest files first, so no worker is left with a big file at the end
+    tickers = [ticker for _, ticker in sorted(stale, reverse=True)]
+    print(f"[•] {len(tickers)} news file(s) to clean in {news_dir}.")
+    if not tickers:
+        return {}
+
+    cleaned_by_ticker = {}
+    max_workers = min(max_workers or os.cpu_count() or 1, len(tickers))
+    # A file that fails is reported and skipped; the others are still cleaned
+    if max_workers == 1:
+        for ticker in tickers:
+            try:
+                cleaned_by_ticker[ticker] = clean_news_file(ticker, output_dir=output_dir, news_dir=news_dir, force=force)
+            except Exception as e:
+                print(f"[!] Cleaning {ticker} failed: {e}")
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+            futures = {executor.submit(_clean_file_worker, ticker, news_dir, output_dir, force): ticker for ticker in tickers}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    cleaned_by_ticker[ticker] = future.result()
+                except Exception as e:
+                    print(f"[!] Cleaning {ticker} failed: {e}")
+    print(f"[✓] Cleaned {len(cleaned_by_ticker)} of {len(tickers)} news file(s) with {max_workers} worker(s).")
+    return cleaned_by_ticker
 
-    # Load raw news
-    with open(input_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+if __name__ == "__main__":
+    import argparse
+    import sys
 
-    # Clean headlines and texts
-    cleaned_data = []
-    for entry in data:
-        cleaned_entry = {
-            "headline": clean_text(entry.get("headline", "")),
-            "text": clean_text(entry.get("text", ""))
-        }
-        cleaned_data.append(cleaned_entry)
+    parser = argparse.ArgumentParser(description="Clean news files in bulk.")
+    commands = parser.add_subparsers(dest="command", required=True)
 
-    # Write cleaned data
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(cleaned_data, f, ensure_ascii=False, indent=2)
+    clean_parser = commands.add_parser("clean", help="Clean every out-of-date *_news.jsonl of a directory.")
+    clean_parser.add_argument("news_dir", nargs="?", default=NEWS_DIR, help="Directory of *_news.jsonl files.")
+    clean_parser.add_argument("--output-dir", help="Where the *_news_cleaned.jsonl files go (default: news_dir).")
+    clean_parser.add_argument("--workers", type=int, help="Worker processes (default: number of CPUs).")
+    clean_parser.add_argument("--force", action="store_true", help="Re-clean every file and article, even if up to date.")
 
-    print(f"[✓] Cleaning complete. Output: {output_path}")
+    args = parser.parse_args()
 
+    if args.command == "clean":
+        clean_news_dir(args.news_dir, args.output_dir, args.workers, args.force)
+        sys.exit(0)
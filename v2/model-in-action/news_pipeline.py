@@ -0,0 +1,186 @@
+# File: news_pipeline.py
+import queue
+import threading
+from article_store import ArticleStore, article_id
+from news_records import append_records, convert_file, news_path
+
+
+# === SETTINGS ===
+# Bounded queues between the stages: a slow stage makes the one before it wait instead of
+# buffering the whole ticker in memory
+QUEUE_SIZE = 64
+# Micro-batches: a stage takes whatever has arrived, up to the batch size, and does not wait
+# longer than BATCH_WAIT_SECONDS for a batch to fill up
+CLEAN_BATCH_SIZE = 16
+SCORE_BATCH_SIZE = 64
+BATCH_WAIT_SECONDS = 0.05
+
+# Marks the end of a stage's output
+_END = object()
+
+# spaCy and the cleaning cache are shared by every pipeline in the process: concurrent pipelines
+# scrape in parallel but take turns cleaning
+_CLEAN_LOCK = threading.Lock()
+
+
+class PipelineCancelled(Exception):
+    """Raised by run_pipeline when its cancel event was set before it finished."""
+
+
+class _Stream(queue.Queue):
+    # Queue between two stages; ended is set once the consumer has taken the end marker
+    ended = False
+
+    def take(self, timeout=None):
+        item = self.get(timeout=timeout)
+        if item is _END:
+            self.ended = True
+        return item
+
+
+def _batches(source, max_size, max_wait=BATCH_WAIT_SECONDS):
+    # Yields lists of items from the stream until the end marker
+    while True:
+        item = source.take()
+        if item is _END:
+            return
+        batch = [item]
+        while len(batch) < max_size:
+            try:
+                item = source.take(timeout=max_wait)
+            except queue.Empty:
+                break
+            if item is _END:
+                yield batch
+                return
+            batch.append(item)
+        yield batch
+
+
+def _drain(source):
+    # Consumes a stream up to its end marker, so a failed stage does not block the stage before it
+    while not source.ended:
+        source.take()
+
+
+def run_pipeline(ticker, predictor, news_dir=None, cleaned_dir=None, persist=True, on_progress=None, cancelled=None):
+    """Scrapes, cleans and scores the new articles of a ticker as one streaming pipeline.
+
+    Each stage runs in its own thread and passes articles on as soon as it has them, so cleaning
+    and scoring happen while the scraper is still scrolling, and the model is loaded while the
+    first page loads. With persist=True the raw and cleaned articles are appended to the news
+    files and the cleaned texts are saved in the article store; with persist=False
+    neither the news files nor the article store are touched.
+
+    predictor is a SentimentPredictor. on_progress(stage, count) is called from the stage threads
+    with the number of articles "scraped", "cleaned" or "scored" so far. Setting the cancelled
+    event (a threading.Event) stops the stages at their next article or batch and makes
+    run_pipeline raise PipelineCancelled.
+
+    The cleaned records are held back until the scraper has recorded its articles in the news
+    file and the article store, and are only written if it did: a cancelled or failed scrape
+    leaves no cleaned records behind, so the next run does not add them a second time. If the
+    scrape was recorded but cleaning was cut short, the articles cleaned so far are written and
+    news_cleaner.py cleans the rest later. Returns article id -> label for the new articles.
+    """
+    from news_scraper_input import OUTPUT_DIR, scrape_yahoo_finance
+    from news_cleaner import clean_texts, warm_up
+
+    if news_dir is None:
+        news_dir = OUTPUT_DIR
+    if cleaned_dir is None:
+        cleaned_dir = news_dir
+
+    scraped = _Stream(QUEUE_SIZE)
+    cleaned = _Stream(QUEUE_SIZE)
+    cleaned_by_id = {}
+    cleaned_records = []  # written once the scrape is recorded (see above)
+    labels = {}
+    errors = []
+    scrape_recorded = threading.Event()
+    progress = {"scraped": 0, "cleaned": 0, "scored": 0}
+
+    def check_cancelled():
+        if cancelled is not None and cancelled.is_set():
+            raise PipelineCancelled(ticker)
+
+    def report(stage, count):
+        # Each counter is only updated by its own stage thread
+        progress[stage] += count
+        if on_progress:
+            on_progress(stage, progress[stage])
+
+    def on_article(article):
+        check_cancelled()
+        scraped.put(article)
+        report("scraped", 1)
+
+    def scrape():
+        try:
+            scrape_yahoo_finance(ticker, output_dir=news_dir, on_article=on_article, save=persist)
+            scrape_recorded.set()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            scraped.put(_END)
+
+    def clean():
+        try:
+            with _CLEAN_LOCK:
+                warm_up()
+            for batch in _batches(scraped, CLEAN_BATCH_SIZE):
+                check_cancelled()
+                texts = []
+                for article in batch:
+                    texts.append(article.get("headline", ""))
+                    texts.append(article.get("text", ""))
+                with _CLEAN_LOCK:
+                    cleaned_texts = clean_texts(texts, n_process=1)
+                check_cancelled()
+
+                records = []
+                for i, article in enumerate(batch):
+                    record = {"id": article_id(article), "headline": cleaned_texts[2 * i], "text": cleaned_texts[2 * i + 1]}
+                    cleaned_by_id[record["id"]] = {"headline": record["headline"], "text": record["text"]}
+                    records.append(record)
+                    cleaned.put(record)
+                cleaned_records.extend(records)
+                report("cleaned", len(records))
+        except Exception as e:
+            errors.append(e)
+            _drain(scraped)
+        finally:
+            cleaned.put(_END)
+
+    def score():
+        try:
+            predictor.load()
+            for batch in _batches(cleaned, SCORE_BATCH_SIZE):
+                check_cancelled()
+                for record, label in zip(batch, predictor.predict([record["text"] for record in batch])):
+                    labels[record["id"]] = label
+                report("scored", len(batch))
+        except Exception as e:
+            errors.append(e)
+            _drain(cleaned)
+
+    stages = [threading.Thread(target=stage, name=f"pipeline-{stage.__name__}", daemon=True)
+              for stage in (scrape, clean, score)]
+    for stage in stages:
+        stage.start()
+    for stage in stages:
+        stage.join()
+
+    if persist and scrape_recorded.is_set():
+        # An old {ticker}_news_cleaned.json becomes the start of the JSONL file, so the new
+        # records are appended to the ticker's history instead of replacing it
+        convert_file(cleaned_dir, ticker, cleaned=True)
+        append_records(news_path(cleaned_dir, ticker, cleaned=True), cleaned_records)
+        store = ArticleStore(news_dir)
+        store.save_cleaned(ticker, cleaned_by_id)
+    check_cancelled()
+    if errors:
+        raise errors[0]
+
+    print(f"[✓] Pipeline scored {len(labels)} new articles for {ticker}.")
+    return labels
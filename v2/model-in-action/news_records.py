@@ -0,0 +1,120 @@
+# File: news_records.py
+import json
+import os
+
+
+# === SETTINGS ===
+# One JSON object per line: readers stream records one at a time and new articles are appended,
+# so neither needs the whole file in memory
+NEWS_SUFFIX = "_news.jsonl"
+CLEANED_SUFFIX = "_news_cleaned.jsonl"
+# Whole-array files written before the switch to JSONL (see convert_directory)
+LEGACY_NEWS_SUFFIX = "_news.json"
+LEGACY_CLEANED_SUFFIX = "_news_cleaned.json"
+
+
+def news_path(directory, ticker, cleaned=False):
+    return os.path.join(directory, f"{ticker}{CLEANED_SUFFIX if cleaned else NEWS_SUFFIX}")
+
+
+def _legacy_path(directory, ticker, cleaned=False):
+    return os.path.join(directory, f"{ticker}{LEGACY_CLEANED_SUFFIX if cleaned else LEGACY_NEWS_SUFFIX}")
+
+
+def read_records(path):
+    # Yields the records of a JSONL file one by one; a legacy .json array is loaded whole
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def append_records(path, records):
+    # Appends records to a JSONL file; returns how many were written
+    count = 0
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def write_records(path, records):
+    # Replaces a JSONL file with the given records (streamed into a temporary file first)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    count = append_records(temp_path, records)
+    os.replace(temp_path, path)
+    return count
+
+
+def existing_news_path(directory, ticker, cleaned=False):
+    # The JSONL file of a ticker, else its legacy .json file (not converted yet), else None
+    for path in (news_path(directory, ticker, cleaned), _legacy_path(directory, ticker, cleaned)):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def has_news(directory, ticker, cleaned=False):
+    return existing_news_path(directory, ticker, cleaned) is not None
+
+
+def read_news(directory, ticker, cleaned=False):
+    # Streams a ticker's raw (or cleaned) records; nothing if the ticker has no file
+    path = existing_news_path(directory, ticker, cleaned)
+    if path is not None:
+        yield from read_records(path)
+
+
+def list_tickers(directory, cleaned=False):
+    # Tickers with a raw (or cleaned) news file, JSONL or legacy, in the directory
+    suffixes = (CLEANED_SUFFIX, LEGACY_CLEANED_SUFFIX) if cleaned else (NEWS_SUFFIX, LEGACY_NEWS_SUFFIX)
+    tickers = set()
+    for filename in os.listdir(directory):
+        for suffix in suffixes:
+            if filename.endswith(suffix):
+                tickers.add(filename[:-len(suffix)])
+    return sorted(tickers)
+
+
+def convert_file(directory, ticker, cleaned=False, remove=False):
+    # Converts a ticker's legacy .json file to JSONL; returns the number of records, or None if
+    # there was nothing to convert (no legacy file, or the JSONL file already exists)
+    legacy_path = _legacy_path(directory, ticker, cleaned)
+    path = news_path(directory, ticker, cleaned)
+    if not os.path.exists(legacy_path) or os.path.exists(path):
+        return None
+    count = write_records(path, read_records(legacy_path))
+    if remove:
+        os.remove(legacy_path)
+    return count
+
+
+def convert_directory(directory, remove=False):
+    # Converts every legacy *_news.json and *_news_cleaned.json file of a directory to JSONL
+    converted = 0
+    for filename in sorted(os.listdir(directory)):
+        for suffix, cleaned in ((LEGACY_CLEANED_SUFFIX, True), (LEGACY_NEWS_SUFFIX, False)):
+            if filename.endswith(suffix):
+                ticker = filename[:-len(suffix)]
+                count = convert_file(directory, ticker, cleaned, remove)
+                if count is not None:
+                    converted += 1
+                    print(f"[✓] {filename} -> {os.path.basename(news_path(directory, ticker, cleaned))} ({count} records)")
+                break
+    print(f"[✓] Converted {converted} file(s) in {directory}.")
+    return converted
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert *_news.json and *_news_cleaned.json files to JSONL.")
+    parser.add_argument("directory", help="Directory holding the news files.")
+    parser.add_argument("--remove", action="store_true", help="Delete each .json file after converting it.")
+    args = parser.parse_args()
+    convert_directory(args.directory, args.remove)
@@ -0,0 +1,290 @@
+# File: sentiment_service.py
+# Keeps the exported model and vectorizer loaded and scores batches of cleaned texts,
+# in-process (SentimentPredictor) or for other tools over a local HTTP endpoint.
+#
+# Usage:
+#   python sentiment_service.py [--port 8765]
+#   curl -d '{"texts": ["apple beat earnings expectation"]}' http://127.0.0.1:8765/predict
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import urllib.request
+from contextlib import closing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# === SETTINGS ===
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model")
+MODEL_PATH = os.path.join(MODEL_DIR, "exported_model_logreg.pkl")
+VECTORIZER_PATH = os.path.join(MODEL_DIR, "tfidf_vectorizer.pkl")
+# NumPy-only copy of the two pickles (see compact_model.py); used instead of them when present
+# and exported from the pickles that are there now
+COMPACT_MODEL_DIR = os.path.join(MODEL_DIR, "compact")
+LABEL_NAMES = {0: "Bearish", 1: "Neutral", 2: "Bullish"}
+# Scores of texts that were already seen, per model (see PredictionCache)
+PREDICTION_CACHE_PATH = os.path.join(MODEL_DIR, "prediction_cache.db")
+
+# Only local clients: the endpoint has no authentication
+HOST = "127.0.0.1"
+PORT = 8765
+SERVICE_URL = f"http://{HOST}:{PORT}"
+MAX_TEXTS_PER_REQUEST = 10000
+
+
+# === Prediction Cache ===
+def text_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    """Label and class probabilities by (hash of the cleaned text, model fingerprint), in SQLite.
+
+    A model's output for a text never changes, and a newly exported model has a new
+    fingerprint, so entries of an old model are simply never hit again.
+    """
+
+    def __init__(self, path=PREDICTION_CACHE_PATH):
+        self.path = path
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS predictions (
+                    text_hash TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    label INTEGER NOT NULL,
+                    probabilities TEXT NOT NULL,
+                    PRIMARY KEY (text_hash, model)
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_many(self, hashes, model):
+        # text hash -> (label, probabilities) for the texts this model already scored
+        found = {}
+        hashes = list(hashes)
+        with closing(self._connect()) as conn:
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT text_hash, label, probabilities FROM predictions "
+                    f"WHERE model = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [model, *chunk],
+                )
+                found.update((key, (label, json.loads(probabilities))) for key, label, probabilities in rows)
+        return found
+
+    def put_many(self, scores, model):
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO predictions (text_hash, model, label, probabilities) VALUES (?, ?, ?, ?)",
+                [(key, model, label, json.dumps(probabilities)) for key, (label, probabilities) in scores.items()],
+            )
+
+
+# === Predictor ===
+def pickle_fingerprint(model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH):
+    # Identifies a pickled model and vectorizer (a compact model records the one it was exported from)
+    digest = hashlib.sha1()
+    for path in (vectorizer_path, model_path):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class SentimentPredictor:
+    """The model and its TF-IDF vectorizer, loaded once on first use and then kept resident.
+
+    If compact_dir holds a compact model exported from the current pickles it is memory-mapped
+    and scored with NumPy; otherwise (no compact model, or a stale one) the scikit-learn
+    pickles are loaded. Texts this model has scored before are
+    answered from the prediction cache; only the others go through the vectorizer and the model.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH, cache_path=PREDICTION_CACHE_PATH,
+                 compact_dir=COMPACT_MODEL_DIR):
+        self.model_path = model_path
+        self.vectorizer_path = vectorizer_path
+        self.compact_dir = compact_dir
+        self.cache_path = cache_path
+        self.cache = None  # opened by load(), so constructing a predictor touches no files
+        self.model = None
+        self.vectorizer = None  # stays None for the compact model, which vectorizes itself
+        self.fingerprint = None  # identifies the loaded model in the prediction cache
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        # Safe to call from several threads; only the first call reads the files
+        with self._lock:
+            if self.model is not None:
+                return self
+            if self.cache_path:
+                self.cache = PredictionCache(self.cache_path)
+            source = self._compact_source()
+            has_pickles = os.path.exists(self.model_path) and os.path.exists(self.vectorizer_path)
+            if source is not None and (not has_pickles or source == pickle_fingerprint(self.model_path, self.vectorizer_path)):
+                from compact_model import CompactModel
+                self.model = CompactModel(self.compact_dir)
+                self.fingerprint = self.model.fingerprint
+                return self
+            if source is not None:
+                print(f"[!] The compact model in {self.compact_dir} was not exported from the current pickles; "
+                      f"using the pickles (re-export it with compact_model.py export).")
+            with open(self.vectorizer_path, "rb") as f:
+                vectorizer_bytes = f.read()
+            with open(self.model_path, "rb") as f:
+                model_bytes = f.read()
+            self.fingerprint = hashlib.sha1(vectorizer_bytes + model_bytes).hexdigest()
+            self.vectorizer = pickle.loads(vectorizer_bytes)
+            self.model = pickle.loads(model_bytes)
+        return self
+
+    def _compact_source(self):
+        # pickle_fingerprint of the pickles the compact model was exported from ("" if not recorded),
+        # or None without a complete export; manifest.json is compact_model.MANIFEST_NAME
+        manifest_path = os.path.join(self.compact_dir, "manifest.json") if self.compact_dir else None
+        if not manifest_path or not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("source", "")
+
+    def _score(self, texts):
+        # (label, probabilities) of each text, each distinct uncached text transformed once
+        self.load()
+        keys = [text_hash(text) for text in texts]
+        scores = self.cache.get_many(set(keys), self.fingerprint) if self.cache else {}
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in scores:
+                missing.setdefault(key, text)
+        if missing:
+            if self.vectorizer is None:
+                labels, probabilities = self.model.predict_with_proba(list(missing.values()))
+            else:
+                X = self.vectorizer.transform(list(missing.values()))
+                labels, probabilities = self.model.predict(X), self.model.predict_proba(X)
+            fresh = {key: (int(label), row.tolist()) for key, label, row in zip(missing, labels, probabilities)}
+            if self.cache:
+                self.cache.put_many(fresh, self.fingerprint)
+            scores.update(fresh)
+
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+        return [scores[key] for key in keys]
+
+    def predict(self, texts):
+        # Label (0: Bearish, 1: Neutral, 2: Bullish) of each cleaned text
+        return [label for label, _ in self._score(texts)]
+
+    def predict_proba(self, texts):
+        # (labels, class probabilities) of each cleaned text, in the order of classes()
+        scores = self._score(texts)
+        return [label for label, _ in scores], [probabilities for _, probabilities in scores]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+    def classes(self):
+        self.load()
+        return [int(label) for label in self.model.classes_]
+
+
+# === HTTP Endpoint ===
+class _PredictHandler(BaseHTTPRequestHandler):
+    predictor = None  # set by serve()
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "classes": self.predictor.classes(),
+                                  "model": self.predictor.fingerprint, "cache": self.predictor.stats()})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        # {"texts": [...]} -> {"labels": [...], "label_names": [...], "probabilities": [[...]], "classes": [...]}
+        if self.path != "/predict":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            texts = request["texts"]
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ValueError("'texts' must be a list of strings")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": f"bad request: {e}"})
+            return
+        if len(texts) > MAX_TEXTS_PER_REQUEST:
+            self._send_json(413, {"error": f"at most {MAX_TEXTS_PER_REQUEST} texts per request"})
+            return
+
+        # A failure while scoring is answered like a bad request, not with a dropped connection
+        try:
+            labels, probabilities = self.predictor.predict_proba(texts)
+            classes = self.predictor.classes()
+        except Exception as e:
+            self._send_json(500, {"error": f"prediction failed: {type(e).__name__}: {e}"})
+            return
+        self._send_json(200, {
+            "labels": labels,
+            "label_names": [LABEL_NAMES.get(label, str(label)) for label in labels],
+            "probabilities": probabilities,
+            "classes": classes,
+        })
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(predictor=None, host=HOST, port=PORT):
+    # Starts the endpoint on a background thread and returns the server (call shutdown() to stop)
+    predictor = (predictor or SentimentPredictor()).load()
+    handler = type("PredictHandler", (_PredictHandler,), {"predictor": predictor})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="sentiment-service", daemon=True).start()
+    return server
+
+
+def score_remote(texts, url=SERVICE_URL, timeout=30):
+    # Client for the endpoint: returns the response of /predict for a batch of cleaned texts
+    request = urllib.request.Request(
+        f"{url}/predict", data=json.dumps({"texts": list(texts)}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.load(response)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the sentiment model over a local HTTP endpoint.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--model", default=MODEL_PATH, help="Pickled classifier.")
+    parser.add_argument("--vectorizer", default=VECTORIZER_PATH, help="Pickled TF-IDF vectorizer.")
+    parser.add_argument("--compact", default=COMPACT_MODEL_DIR,
+                        help="Compact model directory, used instead of the pickles when it exists.")
+    args = parser.parse_args()
+
+    predictor = SentimentPredictor(args.model, args.vectorizer, compact_dir=args.compact)
+    server = serve(predictor, args.host, args.port)
+    print(f"[✓] Sentiment service listening on http://{args.host}:{args.port} (POST /predict, GET /health)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
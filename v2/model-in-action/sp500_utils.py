@@ -0,0 +1,169 @@
+# sp500_utils.py
+# Description: Utility functions related to the S&P 500 index,
+# primarily for fetching the list of constituent tickers.
+# This is the only copy: the v1 crawler and the v2 GUIs import it from v2/model-in-action.
+# The constituents table is cached on disk and shared by every entry point, so callers read a
+# local file and the Wikipedia page is only fetched when the cache is missing or older than its TTL.
+
+import json
+import os
+import threading
+import time
+
+# URL for the Wikipedia page listing S&P 500 companies
+SP500_WIKIPEDIA_URL = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
+
+# On-disk cache of the constituents table, shared by all copies of this module.
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'sp500_universe', 'constituents.json')
+# Age after which the cache is refreshed in the background (in seconds).
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+_refresh_lock = threading.Lock()
+
+
+def fetch_sp500_constituents():
+    """
+    Retrieves the S&P 500 constituents table from Wikipedia.
+
+    Returns:
+        list: A list of dictionaries with 'symbol', 'name' and 'sector' keys
+              (e.g., {'symbol': 'BRK-B', 'name': 'Berkshire Hathaway', 'sector': 'Financials'}).
+              Returns an empty list if an error occurs.
+    """
+    print(f"Attempting to fetch S&P 500 tickers from: {SP500_WIKIPEDIA_URL}")
+    try:
+        # pandas is only needed for a refresh, so it is imported here rather than at startup.
+        import pandas as pd
+
+        # pandas.read_html() reads HTML tables into a list of DataFrame objects.
+        # We expect the first table ([0]) on the Wikipedia page to be the S&P 500 constituents.
+        table = pd.read_html(SP500_WIKIPEDIA_URL)[0]
+
+        # The 'Symbol' column in the table contains the ticker symbols.
+        # Clean up tickers: Some tickers from Wikipedia might have suffixes (e.g., "BRK.B" vs "BRK-B").
+        # Yahoo Finance typically uses "-" for class distinctions.
+        names = table['Security'] if 'Security' in table.columns else table['Symbol']
+        sectors = table['GICS Sector'] if 'GICS Sector' in table.columns else [''] * len(table)
+        constituents = [
+            {'symbol': str(symbol).replace('.', '-'), 'name': str(name), 'sector': str(sector)}
+            for symbol, name, sector in zip(table['Symbol'], names, sectors)
+        ]
+
+        print(f"Successfully retrieved {len(constituents)} S&P 500 tickers.")
+        return constituents
+    except ImportError:
+        print("Error: pandas library not found. Please ensure it's installed ('pip install pandas').")
+        return []
+    except KeyError:
+        print("Error: Could not find the 'Symbol' column in the Wikipedia table. The page structure might have changed.")
+        return []
+    except Exception as e:
+        print(f"An unexpected error occurred while fetching S&P 500 tickers: {e}")
+        return []
+
+
+def _read_cache():
+    """Returns (fetched_at, constituents) from the cache file, or None if it is missing or unreadable."""
+    try:
+        with open(CACHE_PATH, encoding='utf-8') as f:
+            cache = json.load(f)
+        return cache['fetched_at'], cache['constituents']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_cache(constituents):
+    """Writes the cache atomically so concurrent readers never see a partial file."""
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    temp_path = f"{CACHE_PATH}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'fetched_at': time.time(), 'source': SP500_WIKIPEDIA_URL, 'constituents': constituents}, f)
+    os.replace(temp_path, CACHE_PATH)
+
+
+def refresh_sp500_cache():
+    """
+    Fetches the constituents from Wikipedia and stores them in the cache.
+    A failed fetch leaves the existing cache untouched.
+
+    Returns:
+        list: The fetched constituents, or an empty list if the fetch failed.
+    """
+    constituents = fetch_sp500_constituents()
+    if constituents:
+        try:
+            _write_cache(constituents)
+        except OSError as e:
+            print(f"Could not write the S&P 500 cache '{CACHE_PATH}': {e}")
+    return constituents
+
+
+def refresh_in_background(on_refresh=None):
+    """
+    Refreshes the cache on a daemon thread. Does nothing if a refresh is already running.
+
+    Args:
+        on_refresh (callable, optional): Called with the new constituents list after a successful
+                                         refresh. It runs on the background thread.
+    """
+    if not _refresh_lock.acquire(blocking=False):
+        return
+
+    def worker():
+        try:
+            constituents = refresh_sp500_cache()
+            if constituents and on_refresh:
+                on_refresh(constituents)
+        finally:
+            _refresh_lock.release()
+
+    threading.Thread(target=worker, name='sp500-refresh', daemon=True).start()
+
+
+def get_sp500_constituents(max_age=CACHE_TTL_SECONDS, on_refresh=None, block_if_missing=True):
+    """
+    Returns the S&P 500 constituents, served from the on-disk cache whenever possible.
+
+    Args:
+        max_age (float): Cache age (in seconds) after which a background refresh is started.
+                         The stale cache is still returned immediately.
+        on_refresh (callable, optional): Called with the new constituents after a background refresh.
+        block_if_missing (bool): Without a cache, fetch synchronously (True) or return an empty list
+                                 at once and fill the cache in the background (False).
+
+    Returns:
+        list: A list of {'symbol', 'name', 'sector'} dictionaries. Empty if nothing is available.
+    """
+    cached = _read_cache()
+    if cached is not None:
+        fetched_at, constituents = cached
+        if time.time() - fetched_at > max_age:
+            refresh_in_background(on_refresh)
+        return constituents
+
+    if block_if_missing:
+        return refresh_sp500_cache()
+    refresh_in_background(on_refresh)
+    return []
+
+
+def get_sp500_tickers(**kwargs):
+    """
+    Retrieves the list of S&P 500 ticker symbols (cached, see get_sp500_constituents).
+
+    Returns:
+        list: A list of ticker symbols (e.g., ['AAPL', 'MSFT', ...]).
+              Returns an empty list if an error occurs.
+    """
+    return [company['symbol'] for company in get_sp500_constituents(**kwargs)]
+
+
+if __name__ == '__main__':
+    # Example usage of the function when this script is run directly.
+    print("Testing get_sp500_tickers function from sp500_utils.py...")
+    all_tickers = get_sp500_tickers()
+    if all_tickers:
+        print(f"First 10 tickers: {all_tickers[:10]}")
+        print(f"Last 5 tickers: {all_tickers[-5:]}")
+    else:
+        print("Failed to retrieve S&P 500 tickers during test.")
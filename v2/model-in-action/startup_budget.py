@@ -0,0 +1,75 @@
+# File: startup_budget.py
+# Cold-start check for the entry points: imports each one in a fresh interpreter, times it
+# and fails if it takes longer than its budget or pulls in a heavy library at import time.
+#
+# Usage:
+#   python startup_budget.py              # check all entry points
+#   python startup_budget.py --repeat 5   # best of 5 cold starts per entry point
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+# === SETTINGS ===
+# Entry point module -> import budget in seconds
+ENTRY_POINTS = {
+    "main": 1.0,  # the GUI: the window must open without waiting for models
+    "news_cleaner": 0.5,  # batch cleaning: spaCy is loaded on the first clean_text call
+}
+# Libraries that must only be loaded on first use, never by importing an entry point
+HEAVY_MODULES = ("spacy", "thinc", "nltk", "matplotlib", "pandas", "selenium", "sklearn")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "heavy": sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def measure(module, repeat=3):
+    # Best of `repeat` cold imports, each in a new interpreter
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=HERE, capture_output=True, text=True,
+        )
+        process_seconds = time.perf_counter() - start
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+        probe["process_seconds"] = process_seconds
+        if best is None or probe["seconds"] < best["seconds"]:
+            best = probe
+    return best
+
+
+def check_budgets(repeat=3):
+    ok = True
+    for module, budget in ENTRY_POINTS.items():
+        probe = measure(module, repeat)
+        status = "OK"
+        if probe["seconds"] > budget:
+            status = "OVER BUDGET"
+            ok = False
+        if probe["heavy"]:
+            status = f"LOADS {', '.join(probe['heavy'])}"
+            ok = False
+        print(f"{module:>14}: import {probe['seconds'] * 1000:7.1f} ms "
+              f"(process {probe['process_seconds'] * 1000:7.1f} ms, budget {budget * 1000:.0f} ms) {status}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the cold-start import time of the entry points.")
+    parser.add_argument("--repeat", type=int, default=3, help="Cold starts per entry point (the best one counts).")
+    args = parser.parse_args()
+    sys.exit(0 if check_budgets(args.repeat) else 1)
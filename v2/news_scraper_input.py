@@ -1,21 +1,190 @@
 import sys
-import time
 import json
+import atexit
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 import os
+# article_store.py and news_records.py live with the app that uses them (appended, so that
+# this directory's own news_cleaner.py and news_scraper_input.py are still the ones imported)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "model-in-action"))
+from article_store import ArticleStore, article_id, content_id, is_known
+from embedded_stories import extract_embedded_stories
+from news_records import append_records, convert_file, has_news, news_path, read_news, write_records
 
 
-# Set up the Chrome driver
-options = webdriver.ChromeOptions()
-# options.add_argument("--headless")  # Uncomment for headless mode
-options.add_argument("--disable-gpu")
-driver = webdriver.Chrome(options=options)
+# === SETTINGS ===
+OUTPUT_DIR = os.path.join("v2", "input", "cleansed-not_labeled")
+NEWS_LIST_XPATH = '//*[@id="nimbus-app"]/section/section/section/article/section[2]/section/div/div/div/div/ul'
+NEWS_ITEM_XPATH = NEWS_LIST_XPATH + '/li'
+MAX_HEADLINES = 55
+# Scrolling stops once the list has not grown for this long after a scroll
+SCROLL_GROWTH_TIMEOUT = 5
+MAX_SCROLL_ATTEMPTS = 10
+# The news list is newest first, so a few already stored articles in a row mean the rest is known too
+KNOWN_STREAK_TO_STOP = 3
+
+# Number of warm browser sessions kept by the pool, and how many pages a session
+# serves before it is recycled (keeps Chrome's memory growth in check).
+POOL_SIZE = 2
+MAX_PAGES_PER_DRIVER = 20
+
+
+def create_driver():
+    # Set up the Chrome driver
+    options = webdriver.ChromeOptions()
+    # options.add_argument("--headless")  # Uncomment for headless mode
+    options.add_argument("--disable-gpu")
+    return webdriver.Chrome(options=options)
+
+
+# === Driver Pool ===
+class DriverPool:
+    """Keeps up to `size` warm Chrome sessions that are checked out per ticker.
+
+    Sessions are health-checked on checkout and recycled after `max_pages` pages
+    or after a scrape fails with them.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_pages=MAX_PAGES_PER_DRIVER, factory=create_driver):
+        self.size = size
+        self.max_pages = max_pages
+        self.factory = factory
+        self._idle = []  # [driver, pages_served] entries, most recently used last
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def warm_up(self, count=None):
+        # Starts the sessions the pool is missing (up to count in total) ahead of the first checkout,
+        # so no analysis pays for a cold Chrome launch. Idle sessions are left alone; never raises
+        count = self.size if count is None else min(count, self.size)
+        with self._cond:
+            if self._closed:
+                return
+            missing = max(0, count - self._created)
+            # Reserved now: a checkout meanwhile waits for these sessions instead of starting its own
+            self._created += missing
+        for _ in range(missing):
+            try:
+                driver = self.factory()
+            except Exception as e:
+                print(f"[!] Could not start a browser session: {e}")
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                continue
+            with self._cond:
+                if not self._closed:
+                    self._idle.append([driver, 0])
+                    self._cond.notify()
+                    continue
+            self._discard(driver)
+
+    @contextmanager
+    def driver(self, timeout=None):
+        entry = self._checkout(timeout)
+        while not self._is_healthy(entry[0]):
+            print("[!] Browser session failed its health check. Replacing it.")
+            self._discard(entry[0])
+            entry = self._checkout(timeout)
+
+        succeeded = False
+        try:
+            yield entry[0]
+            succeeded = True
+        finally:
+            entry[1] += 1
+            if not succeeded or entry[1] >= self.max_pages or self._closed:
+                self._discard(entry[0])
+            else:
+                self._checkin(entry)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for driver, _ in idle:
+            self._discard(driver)
+
+    def _checkout(self, timeout):
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed.")
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                if not self._cond.wait(timeout):
+                    raise TimeoutError("No browser session became available.")
+        try:
+            return [self.factory(), 0]
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def _checkin(self, entry):
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def _discard(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    # One pool per process, created on first use and shut down at interpreter exit
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = DriverPool()
+            atexit.register(_shared_pool.close)
+        return _shared_pool
+
+
+# === Scraping ===
+def _item_link(item):
+    # The article link is the stable key of a news item; ads and placeholders have none
+    try:
+        return item.find_element(By.XPATH, './/a[@href]').get_attribute("href")
+    except Exception:
+        return None
+
+def scrape_yahoo_finance(ticker, driver=None, output_dir=OUTPUT_DIR, on_article=None, save=True, store=None):
+    # on_article is called with each new article as soon as it is extracted (see news_pipeline.py);
+    # save=False writes neither the news file nor the article store, and only consults a store
+    # the caller passes in (otherwise the news file tells which articles are known)
+    if driver is None:
+        with get_driver_pool().driver() as pooled_driver:
+            return scrape_yahoo_finance(ticker, pooled_driver, output_dir, on_article, save, store)
 
-def scrape_yahoo_finance(ticker):
     url = f"https://finance.yahoo.com/quote/{ticker}/news/"
     driver.get(url)
 
@@ -35,55 +204,134 @@ def scrape_yahoo_finance(ticker):
     except Exception as e:
         print("Consent banner not found or already dismissed:", e)
 
-    # Wait for the news list to load
+    # Wait for the first news items to load
     try:
         WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.XPATH, '//*[@id="nimbus-app"]/section/section/section/article/section[2]/section/div/div/div/div/ul'))
+            EC.presence_of_element_located((By.XPATH, NEWS_ITEM_XPATH))
         )
         print("News list loaded successfully.")
     except Exception as e:
         print("Failed to load news list:", e)
-        driver.quit()
-        return
+        return []
 
-    time.sleep(3)
+    output_file = news_path(output_dir, ticker)
+    if store is None and save:
+        store = ArticleStore(output_dir)
+    known_ids = store.known_ids(ticker) if store is not None else set()
+    if not known_ids and has_news(output_dir, ticker):
+        if save:
+            # First run with the store: adopt the articles of the existing news file
+            store.add_scraped(ticker, read_news(output_dir, ticker))
+            known_ids = store.known_ids(ticker)
+        else:
+            known_ids = set()
+            for article in read_news(output_dir, ticker):
+                known_ids.update((article_id(article), content_id(article)))
+    known_streak = 0
 
     headlines = []
-    scroll_attempts = 0
-    max_scroll_attempts = 5
+    seen_keys = set()
 
-    while len(headlines) < 55 and scroll_attempts < max_scroll_attempts:
-        news_items = driver.find_elements(By.XPATH, '//*[@id="nimbus-app"]/section/section/section/article/section[2]/section/div/div/div/div/ul/li')
-        print(f"Found {len(news_items)} news items on this scroll attempt.")
+    def collect(article):
+        # Returns False once scraping can stop
+        nonlocal known_streak
+        if article["url"] in seen_keys or article["headline"] in seen_keys:
+            return True
+        seen_keys.update(key for key in (article["url"], article["headline"]) if key)
 
-        for item in news_items:
-            if len(headlines) >= 55:
+        if is_known(article, known_ids):
+            known_streak += 1
+            if known_streak >= KNOWN_STREAK_TO_STOP:
+                print("Reached already stored articles.")
+                return False
+            return True
+        known_streak = 0
+        headlines.append(article)
+        if on_article:
+            on_article(article)
+        return len(headlines) < MAX_HEADLINES
+
+    # The stories the page was rendered with come from a single json.loads of its embedded payload;
+    # the DOM walk below only picks up what scrolling adds (or everything, if there is no payload)
+    done = False
+    processed = 0
+    embedded = extract_embedded_stories(driver.page_source)
+    if embedded:
+        print(f"Found {len(embedded)} news items in the embedded page data.")
+        processed = len(driver.find_elements(By.XPATH, NEWS_ITEM_XPATH))
+        for story in embedded:
+            if not collect({"headline": story["headline"], "text": story["text"], "url": story["url"]}):
+                done = True
                 break
+
+    scroll_attempts = 0
+    while not done and scroll_attempts < MAX_SCROLL_ATTEMPTS:
+        # Only look at the items appended since the previous pass
+        news_items = driver.find_elements(By.XPATH, NEWS_ITEM_XPATH)
+        new_items = news_items[processed:]
+        processed = len(news_items)
+        print(f"Found {len(new_items)} new news items ({processed} in total) on this scroll attempt.")
+
+        for item in new_items:
             try:
                 headline = item.find_element(By.XPATH, './/h3').text
                 text = item.find_element(By.XPATH, './/p').text
-                headlines.append({"headline": headline, "text": text})
             except Exception as e:
                 print("Error extracting headline or text:", e)
+                continue
+
+            if not collect({"headline": headline, "text": text, "url": _item_link(item)}):
+                done = True
+                break
+
+        if done:
+            break
 
+        # Scroll and wait until the list actually grows instead of sleeping a fixed time
         driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.END)
         scroll_attempts += 1
-        time.sleep(5)
+        try:
+            WebDriverWait(driver, SCROLL_GROWTH_TIMEOUT).until(
+                lambda d: len(d.find_elements(By.XPATH, NEWS_ITEM_XPATH)) > processed
+            )
+        except TimeoutException:
+            print("News list stopped growing.")
+            break
 
-    output_dir = "v2\\input\\cleansed-not_labeled"
-    os.makedirs(output_dir, exist_ok=True)
+    if not save:
+        # Nothing is recorded: a later run that saves will find these articles new again
+        return headlines
 
-    output_file = os.path.join(output_dir, f"{ticker}_news.json")
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(headlines, f, ensure_ascii=False, indent=4)
+    # The news file keeps the full article history: new articles are appended to it
+    new_articles = store.add_scraped(ticker, headlines)
+    convert_file(output_dir, ticker)  # an old {ticker}_news.json becomes the start of the JSONL file
+    if os.path.exists(output_file):
+        append_records(output_file, new_articles)
+    else:
+        write_records(output_file, store.articles(ticker))
+
+    print(f"Saved {len(new_articles)} new headlines to {output_file}.")
+    return new_articles
 
-    print(f"Saved {len(headlines)} headlines to {output_file}.")
+def scrape_tickers(tickers, output_dir=OUTPUT_DIR, max_workers=None):
+    # Scrape several tickers in parallel, one pooled browser session per worker
+    pool = get_driver_pool()
+    with ThreadPoolExecutor(max_workers=max_workers or pool.size) as executor:
+        futures = {ticker: executor.submit(scrape_yahoo_finance, ticker, None, output_dir) for ticker in tickers}
+
+    results = {}
+    for ticker, future in futures.items():
+        try:
+            results[ticker] = future.result()
+        except Exception as e:
+            print(f"[!] Scraping failed for {ticker}:", e)
+            results[ticker] = []
+    return results
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
-        ticker = sys.argv[1].upper()
+        tickers = [arg.upper() for arg in sys.argv[1:]]
     else:
-        ticker = input("Enter a stock ticker symbol (e.g., AAPL, MSFT): ").upper().strip()
-    
-    scrape_yahoo_finance(ticker)
-    driver.quit()
+        tickers = [input("Enter a stock ticker symbol (e.g., AAPL, MSFT): ").upper().strip()]
+
+    scrape_tickers(tickers)
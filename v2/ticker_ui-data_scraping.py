@@ -1,92 +1,64 @@
 #the main pipeline runner .py
-#news_scrapper_input.py will be triggered
-#news_cleaner.py will be triggered
-#then the new cleansed news are stored in input with name as ..._news_cleaned.json
+#scrapes the ticker in-process with news_scraper_input.py (pooled browser session)
+#and cleans the new articles with news_cleaner.py
+#raw and cleansed news are appended to ..._news.jsonl and ..._news_cleaned.jsonl in input
 
 
-import pandas as pd
+import os
+import sys
 import tkinter as tk
-from tkinter import ttk
-import subprocess
-from news_cleaner import clean_news_file
-
-
-
-# Function to get the list of S&P 500 tickers
-def get_sp500_tickers():
-    url = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
-    tables = pd.read_html(url)
-    sp500_table = tables[0]
-    tickers = sp500_table['Symbol'].tolist()
-    return tickers
-
-class AutocompleteEntry(ttk.Entry):
-    def __init__(self, autocomplete_list, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.autocomplete_list = autocomplete_list
-        self.var = self["textvariable"] = tk.StringVar()
-        self.var.trace_add("write", self.changed)
-        self.bind("<Right>", self.select_suggestion)
-        self.listbox = None
-
-    def changed(self, *args):
-        value = self.var.get().upper()
-        if value == "":
-            self.hide_listbox()
-            return
-
-        matches = [s for s in self.autocomplete_list if s.startswith(value)]
-        if matches:
-            if not self.listbox:
-                self.listbox = tk.Listbox(width=15)
-                self.listbox.bind("<<ListboxSelect>>", self.on_select)
-                self.listbox.place(x=self.winfo_x(), y=self.winfo_y() + self.winfo_height())
-            self.listbox.delete(0, tk.END)
-            for match in matches:
-                self.listbox.insert(tk.END, match)
-        else:
-            self.hide_listbox()
-
-    def on_select(self, event):
-        if self.listbox:
-            selection = self.listbox.get(self.listbox.curselection())
-            self.var.set(selection)
-            self.hide_listbox()
-
-    def select_suggestion(self, event):
-        if self.listbox and self.listbox.size() > 0:
-            self.var.set(self.listbox.get(0))
-            self.hide_listbox()
-
-    def hide_listbox(self):
-        if self.listbox:
-            self.listbox.destroy()
-            self.listbox = None
+import threading
+# sp500_utils.py and autocomplete.py live with the app that uses them (appended, so that
+# this directory's own news_cleaner.py and news_scraper_input.py are still the ones imported)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "model-in-action"))
+from sp500_utils import get_sp500_constituents
+from autocomplete import AutocompleteEntry
+
+# The scraper (selenium) and the cleaner (spaCy) are imported where they are first used,
+# so the window opens without paying for them.
+
+
 
 def run_scraper(ticker):
     if ticker:
+        from news_scraper_input import scrape_yahoo_finance
+        from news_cleaner import clean_news_file
         print(f"[•] Running news scraper for {ticker}...")
-        subprocess.run(["python", "v2\\news_scraper_input.py", ticker])
+        scrape_yahoo_finance(ticker)
         print(f"[•] Cleaning scraped news for {ticker}...")
         clean_news_file(ticker)
     else:
         print("Please enter a ticker.")
 
 
+def warm_up_scraper():
+    # Fetch News scrapes one ticker at a time on the Tk thread, so one warm session is enough
+    from news_scraper_input import get_driver_pool
+    get_driver_pool().warm_up(1)
+
+
 def main():
     root = tk.Tk()
     root.title("Stock News Scraper")
     root.geometry("300x200")
 
-    # Get S&P 500 tickers and set it as the autocomplete list
-    sp500_tickers = get_sp500_tickers()
-
     tk.Label(root, text="Enter Ticker Symbol:").pack(pady=10)
 
-    # Create an autocomplete entry using the list of S&P 500 tickers
-    entry = AutocompleteEntry(sp500_tickers, root)
+    # Create an autocomplete entry, filled with the list of S&P 500 tickers below
+    entry = AutocompleteEntry([], root)
     entry.pack()
 
+    # Get S&P 500 tickers and set it as the autocomplete list.
+    # Served from the on-disk cache; a missing or stale cache is refreshed in the background
+    sp500_companies = get_sp500_constituents(
+        block_if_missing=False,
+        on_refresh=lambda constituents: root.after(0, entry.set_completions, constituents),
+    )
+    entry.set_completions(sp500_companies)
+
+    # Launch the browser sessions while the user is still typing
+    threading.Thread(target=warm_up_scraper, daemon=True).start()
+
     # Button to fetch news for the entered ticker
     button = tk.Button(root, text="Fetch News", command=lambda: run_scraper(entry.get()))
     button.pack(pady=20)